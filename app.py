@@ -1,17 +1,20 @@
 import base64
 import copy
+import functools
 import hashlib
 import io
 import json
 import math
 import os
 import re
+import shutil
+import threading
 from datetime import datetime, time, date, timezone as datetime_timezone
 from pathlib import Path
 from typing import Optional
 from urllib.parse import quote
 
-import pandas as pd
+import numpy as np
 import streamlit as st
 import time as _time
 import requests
@@ -41,6 +44,68 @@ try:
 except ImportError:
     GEO_AVAILABLE = False
 
+# Optional: SIMD base64 codec with the same API as the stdlib module
+try:
+    import pybase64 as _b64
+except ImportError:
+    _b64 = base64
+
+# Optional: fast JSON codec for report files
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Optional: fast non-cryptographic hashing for cache keys
+try:
+    import xxhash
+
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+# Optional: Pillow for downscaling uploaded images
+try:
+    from PIL import Image, ImageOps
+
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+
+# Rarely used dependencies are imported on first use to keep cold starts fast.
+@functools.lru_cache(maxsize=1)
+def _pypdf():
+    """Return the PyPDF2 module, or None if it is not installed."""
+    try:
+        import PyPDF2
+    except ImportError:
+        return None
+    return PyPDF2
+
+
+@functools.lru_cache(maxsize=1)
+def _nominatim_class():
+    """Return geopy's Nominatim geocoder class, or None if geopy is missing."""
+    try:
+        from geopy.geocoders import Nominatim
+    except ImportError:
+        return None
+    return Nominatim
+
+
+@functools.lru_cache(maxsize=1)
+def _excel_engine() -> str:
+    """Prefer the streaming xlsxwriter engine, falling back to openpyxl."""
+    try:
+        import xlsxwriter  # noqa: F401
+    except ImportError:
+        return "openpyxl"
+    return "xlsxwriter"
+
+
 # ---------- Database functions for storing/loading reports ----------
 REPORTS_DIR = Path(__file__).parent / "data" / "reports"
 
@@ -50,79 +115,217 @@ def ensure_reports_directory():
     REPORTS_DIR.mkdir(parents=True, exist_ok=True)
 
 
+_FN_STRIP = re.compile(r'[^\w\s-]')
+_FN_COLLAPSE = re.compile(r'[-\s]+')
+
+
 def sanitize_filename(text):
     """Sanitize text for use in filenames."""
     # Replace spaces and special characters
-    import re
-    text = re.sub(r'[^\w\s-]', '', text)
-    text = re.sub(r'[-\s]+', '_', text)
-    return text[:50]  # Limit length
+    return _FN_COLLAPSE.sub('_', _FN_STRIP.sub('', text))[:50]  # Limit length
+
+
+# Compact JSON by default; EDS_PRETTY_JSON=1 indents saved reports for diffing.
+PRETTY_REPORT_JSON = os.environ.get("EDS_PRETTY_JSON", "").strip().lower() in ("1", "true", "yes")
+
+
+def dump_report_json(record) -> bytes:
+    """Serialise a report record to UTF-8 JSON bytes."""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if PRETTY_REPORT_JSON:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(record, option=option, default=str)
+    if PRETTY_REPORT_JSON:
+        return json.dumps(record, indent=2, ensure_ascii=False, default=str).encode("utf-8")
+    return json.dumps(
+        record, separators=(",", ":"), ensure_ascii=False, default=str
+    ).encode("utf-8")
+
+
+def load_report_json(raw: bytes):
+    """Parse report JSON bytes."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+# Raw photo/diagram bytes are written next to each report instead of being
+# base64-inlined in the JSON.
+BLOB_EXTENSIONS = {"image/jpeg": ".jpg", "image/png": ".png"}
+
+
+def report_blob_dir(report_path) -> Path:
+    """Sidecar directory holding the raw photo/diagram files of a report."""
+    return Path(report_path).with_suffix(".d")
+
+
+def _blob_extension(entry: dict) -> str:
+    ext = BLOB_EXTENSIONS.get(entry.get("mime") or "")
+    if ext:
+        return ext
+    suffix = Path(entry.get("name") or "").suffix.lower()
+    return suffix if suffix in (".jpg", ".jpeg", ".png") else ".bin"
+
+
+def get_photo_bytes(entry) -> Optional[bytes]:
+    """Return the raw bytes of a photo/diagram record, loading them on first access.
+
+    Records returned by ``decode_binary_data`` keep legacy base64 strings or a
+    sidecar ``_path`` untouched until the bytes are actually needed; the
+    result is cached back into ``entry["data"]``.
+    """
+    if not isinstance(entry, dict):
+        return None
+    payload = entry.get("data")
+    if isinstance(payload, bytes):
+        return payload
+    if isinstance(payload, (bytearray, memoryview)):
+        payload = bytes(payload)
+    elif isinstance(payload, str):
+        try:
+            payload = _b64.b64decode(payload, validate=False)
+        except Exception:
+            payload = b""
+    elif payload is None and entry.get("_path"):
+        try:
+            payload = Path(entry["_path"]).read_bytes()
+        except OSError:
+            payload = b""
+    else:
+        return None
+    entry["data"] = payload
+    entry.pop("_path", None)
+    return payload
+
+
+def _new_fingerprint_hasher():
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_128()
+    return hashlib.blake2b(digest_size=16)
 
 
-def encode_binary_data(site_record):
-    """Encode binary data (photos, diagrams) to base64 for JSON storage."""
+def photo_fingerprint(entry) -> Optional[str]:
+    """Fast 128-bit fingerprint of a photo/diagram payload, cached on the record as ``_h``.
+
+    Used for cache keys and local deduplication; use ``photo_sha256`` where
+    the digest is persisted or integrity matters.
+    """
+    if not isinstance(entry, dict):
+        return None
+    cached = entry.get("_h")
+    if cached is None:
+        payload = get_photo_bytes(entry)
+        if payload is None:
+            return None
+        hasher = _new_fingerprint_hasher()
+        hasher.update(payload)
+        cached = entry["_h"] = hasher.hexdigest()
+    return cached
+
+
+def site_fingerprint(site: dict) -> str:
+    """Stable fingerprint of a site record for use as a cache key.
+
+    Scalar fields are hashed directly; photos and the diagram contribute
+    their cached ``photo_fingerprint`` so large payloads are hashed only once.
+    """
+    hasher = _new_fingerprint_hasher()
+    scalars = {
+        k: v for k, v in site.items() if k not in ("photos", "diagram") and not k.startswith("_")
+    }
+    hasher.update(json.dumps(scalars, sort_keys=True, default=str).encode("utf-8"))
+    entries = [("photo", p) for p in site.get("photos") or []]
+    entries.append(("diagram", site.get("diagram")))
+    for kind, entry in entries:
+        if isinstance(entry, dict):
+            meta = f"|{kind}|{entry.get('name')}|{entry.get('mime')}|{photo_fingerprint(entry)}"
+            hasher.update(meta.encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def photo_sha256(entry) -> Optional[str]:
+    """SHA-256 hex digest of a photo/diagram payload, cached on the record as ``_sha256``."""
+    if not isinstance(entry, dict):
+        return None
+    cached = entry.get("_sha256")
+    if cached is None:
+        payload = get_photo_bytes(entry)
+        if payload is None:
+            return None
+        cached = entry["_sha256"] = hashlib.sha256(payload).hexdigest()
+    return cached
+
+
+def _encode_blob(entry: dict, blob_dir: Optional[Path], stem: str) -> dict:
+    """Return a JSON-safe copy of a photo/diagram record."""
+    entry_copy = {k: v for k, v in entry.items() if not k.startswith("_")}
+    payload = get_photo_bytes(entry)
+    if not payload:
+        return entry_copy
+
+    if blob_dir is None:
+        entry_copy["data"] = _b64.b64encode(payload).decode("utf-8")
+        return entry_copy
+
+    filename = f"{stem}{_blob_extension(entry_copy)}"
+    blob_dir.mkdir(parents=True, exist_ok=True)
+    (blob_dir / filename).write_bytes(payload)
+    entry_copy.pop("data", None)
+    entry_copy["path"] = filename
+    return entry_copy
+
+
+def _decode_blob(entry: dict, blob_dir: Optional[Path]) -> dict:
+    """Return a copy of a photo/diagram record whose bytes load lazily."""
+    entry_copy = entry.copy()
+    if entry_copy.get("data") is None and entry_copy.get("path") and blob_dir is not None:
+        entry_copy["_path"] = str(blob_dir / Path(entry_copy["path"]).name)
+    return entry_copy
+
+
+def encode_binary_data(site_record, blob_dir: Optional[Path] = None):
+    """Prepare binary data (photos, diagrams) for JSON storage.
+
+    With ``blob_dir`` the raw bytes are written to sidecar files in that
+    directory and the JSON keeps only their relative ``path``; without it the
+    bytes are base64 encoded inline.
+    """
     encoded = site_record.copy()
-    
+
     # Encode diagram
-    if encoded.get("diagram") and encoded["diagram"].get("data"):
-        encoded["diagram"] = encoded["diagram"].copy()
-        encoded["diagram"]["data"] = base64.b64encode(
-            encoded["diagram"]["data"]
-        ).decode("utf-8")
-    
+    if encoded.get("diagram") and (encoded["diagram"].get("data") or encoded["diagram"].get("_path")):
+        encoded["diagram"] = _encode_blob(encoded["diagram"], blob_dir, "diagram")
+
     # Encode photos
     if encoded.get("photos"):
-        encoded["photos"] = []
-        for photo in site_record["photos"]:
-            photo_copy = photo.copy()
-            if photo_copy.get("data"):
-                photo_copy["data"] = base64.b64encode(photo_copy["data"]).decode("utf-8")
-            encoded["photos"].append(photo_copy)
-    
+        encoded["photos"] = [
+            _encode_blob(photo, blob_dir, f"photo_{idx}")
+            for idx, photo in enumerate(site_record["photos"])
+        ]
+
     return encoded
 
 
-def decode_binary_data(site_record):
-    """Decode base64 binary data back to bytes."""
+def decode_binary_data(site_record, blob_dir: Optional[Path] = None):
+    """Prepare stored binary data (sidecar files or legacy base64) for lazy loading.
+
+    The bytes themselves are only read or decoded by ``get_photo_bytes``.
+    """
     decoded = site_record.copy()
-    
+    if blob_dir is None and decoded.get("_filepath"):
+        blob_dir = report_blob_dir(decoded["_filepath"])
+
     # Decode diagram
-    if decoded.get("diagram") and decoded["diagram"].get("data"):
-        decoded["diagram"] = decoded["diagram"].copy()
-        payload = decoded["diagram"].get("data")
-        if isinstance(payload, (bytes, bytearray)):
-            decoded["diagram"]["data"] = bytes(payload)
-        elif isinstance(payload, memoryview):
-            decoded["diagram"]["data"] = payload.tobytes()
-        elif isinstance(payload, str):
-            try:
-                decoded["diagram"]["data"] = base64.b64decode(payload)
-            except Exception:
-                decoded["diagram"]["data"] = b""
-        else:
-            decoded["diagram"]["data"] = b""
-    
+    if isinstance(decoded.get("diagram"), dict):
+        decoded["diagram"] = _decode_blob(decoded["diagram"], blob_dir)
+
     # Decode photos
     if decoded.get("photos"):
-        decoded["photos"] = []
-        for photo in site_record["photos"]:
-            photo_copy = photo.copy()
-            payload = photo_copy.get("data")
-            if isinstance(payload, (bytes, bytearray)):
-                photo_copy["data"] = bytes(payload)
-            elif isinstance(payload, memoryview):
-                photo_copy["data"] = payload.tobytes()
-            elif isinstance(payload, str):
-                try:
-                    photo_copy["data"] = base64.b64decode(payload)
-                except Exception:
-                    photo_copy["data"] = b""
-            elif payload is None:
-                photo_copy["data"] = None
-            else:
-                photo_copy["data"] = b""
-            decoded["photos"].append(photo_copy)
-    
+        decoded["photos"] = [
+            _decode_blob(photo, blob_dir) for photo in site_record["photos"]
+        ]
+
     return decoded
 
 
@@ -150,31 +353,94 @@ def save_report_to_database(site_record):
     filename = f"{project}_{site}_{timestamp}.json"
     filepath = REPORTS_DIR / filename
 
-    # Encode binary data
-    encoded_record = encode_binary_data(site_record)
+    # Write photos/diagram as sidecar files; the JSON only references them
+    encoded_record = encode_binary_data(site_record, blob_dir=report_blob_dir(filepath))
 
     # Save to JSON
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(encoded_record, f, indent=2, default=str)
+    filepath.write_bytes(dump_report_json(encoded_record))
 
     clear_saved_reports_cache()
     return filename
 
 
-def _load_all_reports_from_disk():
-    """Read all persisted reports from disk, decoding any binary blobs."""
+def _report_file_mtimes() -> dict:
+    """``{filename: mtime_ns}`` for every saved report, from one directory scan."""
     ensure_reports_directory()
+    mtimes = {}
+    with os.scandir(REPORTS_DIR) as entries:
+        for entry in entries:
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                if entry.is_file():
+                    mtimes[entry.name] = entry.stat().st_mtime_ns
+            except FileNotFoundError:
+                continue
+    return mtimes
+
+
+def reports_directory_fingerprint(mtimes: Optional[dict] = None):
+    """Cheap signature of the reports directory that changes when any report does."""
+    if mtimes is None:
+        mtimes = _report_file_mtimes()
+    return (len(mtimes), max(mtimes.values(), default=0), REPORTS_DIR.stat().st_mtime_ns)
+
+
+REPORT_SEARCH_KEYS = ("project_name", "site_name", "client", "site_id")
+
+
+def report_search_blob(report: dict) -> str:
+    """Lower-cased searchable text of ``report``, matched by the saved-reports filter."""
+    return "\n".join(str(report.get(k) or "").lower() for k in REPORT_SEARCH_KEYS)
+
+
+REPORT_PARSE_CACHE_MAX_ENTRIES = 1024
+
+
+@st.cache_resource(show_spinner=False)
+def _parsed_report_cache() -> dict:
+    """``(filepath, mtime_ns) -> report`` shared by all sessions and reruns.
+
+    Reports are shared objects, so callers copy before editing one.
+    """
+    return {}
+
+
+def _parse_report_file(filepath: str, mtime_ns: int) -> dict:
+    """Parse one saved report; unchanged files are served from memory."""
+    cache = _parsed_report_cache()
+    key = (filepath, mtime_ns)
+    data = cache.get(key)
+    if data is not None:
+        return data
+
+    path = Path(filepath)
+    data = load_report_json(path.read_bytes())
+    data["_filename"] = path.name
+    data["_filepath"] = filepath
+    data["_mtime_ns"] = mtime_ns
+    data["_search_blob"] = report_search_blob(data)
+    cache[key] = data
+    # Oldest entries go first; superseded versions of edited files are among them.
+    for stale in list(cache)[: max(0, len(cache) - REPORT_PARSE_CACHE_MAX_ENTRIES)]:
+        cache.pop(stale, None)
+    return data
+
+
+def _load_all_reports_from_disk(mtimes: Optional[dict] = None):
+    """Read all persisted reports from disk, parsing only new or changed files.
+
+    ``mtimes`` reuses an existing directory scan.
+    """
+    if mtimes is None:
+        mtimes = _report_file_mtimes()
 
     reports = []
-    for filepath in sorted(REPORTS_DIR.glob("*.json"), reverse=True):
+    for name in sorted(mtimes, reverse=True):
         try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                data["_filename"] = filepath.name
-                data["_filepath"] = str(filepath)
-                reports.append(data)
+            reports.append(_parse_report_file(str(REPORTS_DIR / name), mtimes[name]))
         except Exception as e:
-            st.warning(f"Could not load {filepath.name}: {e}")
+            st.warning(f"Could not load {name}: {e}")
 
     return reports
 
@@ -182,25 +448,122 @@ def _load_all_reports_from_disk():
 def clear_saved_reports_cache():
     """Remove any cached saved reports (forces disk reload on next access)."""
     st.session_state.pop("_saved_reports_cache", None)
-    st.session_state.pop("_saved_reports_asset_cache", None)
+    st.session_state.pop("_saved_reports_fingerprint", None)
+
+
+# Saved-report exports are keyed on (filename, mtime_ns): a file that changes on
+# disk gets new bytes, and renders are shared across sessions and refreshes.
+@st.cache_data(max_entries=512, show_spinner=False)
+def _saved_report_pdf_bytes(filename: str, mtime_ns, _report: dict) -> bytes:
+    return complete_site_pdf_bytes(decode_binary_data(copy.deepcopy(_report)))
+
+
+def saved_report_pdf_bytes(filename: str, mtime_ns, report: dict) -> bytes:
+    """PDF bytes for one saved report; a render without its map is not memoised."""
+    try:
+        return _saved_report_pdf_bytes(filename, mtime_ns, report)
+    except IncompleteSitePdf as exc:
+        return exc.pdf
+
+
+@st.cache_data(max_entries=512, show_spinner=False)
+def saved_report_excel_bytes(filename: str, mtime_ns, _report: dict) -> bytes:
+    """Excel workbook bytes for one saved report."""
+    return create_excel_bytes([decode_binary_data(copy.deepcopy(_report))]).getvalue()
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def saved_reports_pdf_bytes(keys: tuple, _reports: list) -> bytes:
+    """Combined PDF bytes for ``_reports``, keyed on their (filename, mtime_ns) pairs.
+
+    All reports are drawn on one canvas, so pages are numbered across the
+    whole document.
+    """
+    sites = [decode_binary_data(copy.deepcopy(r)) for r in _reports]
+    return create_pdf_bytes(sites).getvalue()
 
 
-def _get_saved_reports_asset_cache():
-    return st.session_state.setdefault("_saved_reports_asset_cache", {})
+@st.cache_data(max_entries=4, show_spinner=False)
+def saved_reports_excel_bytes(keys: tuple, _reports: list) -> bytes:
+    """Excel workbook bytes for ``_reports``, keyed on their (filename, mtime_ns) pairs."""
+    return create_excel_bytes(
+        [decode_binary_data(copy.deepcopy(r)) for r in _reports]
+    ).getvalue()
 
 
 def load_all_reports(force_refresh: bool = False):
-    """Load reports, using Streamlit session caching to avoid repeated disk IO."""
+    """Load reports, using Streamlit session caching to avoid repeated disk IO.
+
+    The cache is revalidated against the directory fingerprint on every call,
+    so reports added or changed outside this session are picked up.
+    """
     if force_refresh:
         clear_saved_reports_cache()
 
+    mtimes = _report_file_mtimes()
+    fingerprint = reports_directory_fingerprint(mtimes)
     cached = st.session_state.get("_saved_reports_cache")
-    if cached is None:
-        cached = _load_all_reports_from_disk()
+    if cached is None or st.session_state.get("_saved_reports_fingerprint") != fingerprint:
+        cached = _load_all_reports_from_disk(mtimes=mtimes)
         st.session_state["_saved_reports_cache"] = cached
+        st.session_state["_saved_reports_fingerprint"] = fingerprint
     return cached
 
 
+REPORT_SORT_FIELDS = {"Project": "project_name", "Site": "site_name"}
+
+
+def sort_saved_reports(reports: list, sort_by: str) -> list:
+    """``reports`` (newest first, as loaded) in ``sort_by`` order.
+
+    Orderings are memoised for as long as ``load_all_reports`` keeps returning
+    the same list, so typing in the search box doesn't re-sort on every rerun.
+    """
+    memo = st.session_state.get("_sorted_reports_memo")
+    if memo is None or memo[0] is not reports:
+        memo = (reports, {})
+        st.session_state["_sorted_reports_memo"] = memo
+    ordered = memo[1].get(sort_by)
+    if ordered is None:
+        field = REPORT_SORT_FIELDS.get(sort_by)
+        if field:
+            ordered = sorted(reports, key=lambda r: str(r.get(field) or "").lower())
+        elif sort_by == "Date (oldest)":
+            ordered = reports[::-1]
+        else:
+            ordered = reports
+        memo[1][sort_by] = ordered
+    return ordered
+
+
+DRAFT_DATE_KEYS = ("install_date", "prepared_date", "reviewed_date")
+
+
+def normalize_draft(draft: dict) -> dict:
+    """Return a shallow copy of ``draft`` with its ISO date/time strings parsed.
+
+    Done once when a draft is loaded so the form doesn't re-parse on every rerun.
+    Unparseable values fall back to today / 09:00 as the widgets did before;
+    blank values are left for the widgets' own defaults.
+    """
+    out = dict(draft)
+    for key in DRAFT_DATE_KEYS:
+        val = out.get(key)
+        if isinstance(val, str) and val:
+            try:
+                out[key] = date.fromisoformat(val)
+            except ValueError:
+                out[key] = date.today()
+    val = out.get("install_time")
+    if isinstance(val, str) and val:
+        try:
+            h, m = map(int, val.split(":"))
+            out["install_time"] = time(h, m)
+        except Exception:
+            out["install_time"] = time(9, 0)
+    return out
+
+
 def load_report_into_form(report: dict, *, edit_index=None, success_message: Optional[str] = None):
     """Copy the provided report into the form session state and trigger feedback."""
     if not report:
@@ -208,7 +571,10 @@ def load_report_into_form(report: dict, *, edit_index=None, success_message: Opt
 
     # Make a defensive copy so editing the draft never mutates cached records.
     report_copy = copy.deepcopy(report)
-    draft_copy = decode_binary_data(report_copy)
+    draft_copy = normalize_draft(decode_binary_data(report_copy))
+    # Read sidecar files now so the draft survives deletion of the report.
+    for entry in [*(draft_copy.get("photos") or []), draft_copy.get("diagram")]:
+        get_photo_bytes(entry)
 
     st.session_state["draft_site"] = draft_copy
     st.session_state["edit_index"] = edit_index
@@ -229,7 +595,15 @@ def delete_report_from_database(filename):
     """Delete a report from the database."""
     filepath = REPORTS_DIR / filename
     if filepath.exists():
+        # The cached PDF is keyed by content, which needs the sidecar files.
+        try:
+            report = load_report_json(filepath.read_bytes())
+            report["_filepath"] = str(filepath)
+            discard_cached_site_pdf(decode_binary_data(report))
+        except Exception:
+            pass
         filepath.unlink()
+        shutil.rmtree(report_blob_dir(filepath), ignore_errors=True)
         clear_saved_reports_cache()
         return True
     return False
@@ -250,26 +624,54 @@ HEADER_CONTENT_OFFSET = HEADER_BAR_HEIGHT + HEADER_CONTENT_GAP
 
 # ---------- Canvas with "page x of y" ----------
 class NumberedCanvas(canvas.Canvas):
-    def __init__(self, *args, **kwargs):
-        canvas.Canvas.__init__(self, *args, **kwargs)
-        self._saved_page_states = []
+    """Canvas that labels every page "N of M" once the page total is known.
+
+    Each page references a per-page form XObject when it is shown; ``finish``
+    defines those forms after drawing, so pages never need to be replayed.
+    """
+
+    def __init__(self, buf, **kwargs):
+        canvas.Canvas.__init__(self, buf, **kwargs)
+        self._buf = buf
+        # footer text -> form name, so each distinct footer is laid out once
+        self.footer_forms = {}
 
     def showPage(self):
-        self._saved_page_states.append(dict(self.__dict__))
-        self._startPage()
-
-    def save(self):
-        num_pages = len(self._saved_page_states)
-        for state in self._saved_page_states:
-            self.__dict__.update(state)
-            self._draw_page_number(num_pages)
-            canvas.Canvas.showPage(self)
-        canvas.Canvas.save(self)
-
-    def _draw_page_number(self, page_count):
+        self.doForm(f"pageNumber{self._pageNumber}")
+        canvas.Canvas.showPage(self)
+
+    # The draw helpers set their font and colour unconditionally; skip the PDF
+    # operator when that state is already current. ReportLab resets/restores
+    # these attributes with the graphics state, so they track the stream.
+    def setFont(self, psfontname, size, leading=None):
+        if leading is None:
+            leading = size * 1.2
+        if (psfontname, size, leading) != (self._fontname, self._fontsize, self._leading):
+            canvas.Canvas.setFont(self, psfontname, size, leading)
+
+    def setFillGray(self, gray, alpha=None):
+        if alpha is not None or self._fillColorObj != (gray, gray, gray):
+            canvas.Canvas.setFillGray(self, gray, alpha)
+
+    @property
+    def page_count(self) -> int:
+        return self._pageNumber - 1
+
+    def finish(self) -> bytes:
+        """Fill in the page labels, save the document and return its bytes."""
+        if self._code:
+            self.showPage()
+        for idx in range(1, self.page_count + 1):
+            self.beginForm(f"pageNumber{idx}")
+            self._draw_page_number(idx, self.page_count)
+            self.endForm()
+        self.save()
+        return self._buf.getvalue()
+
+    def _draw_page_number(self, page_number, page_count):
         self.setFont("Helvetica", 8)
         self.setFillGray(0.3)
-        text = f"{self._pageNumber} of {page_count}"
+        text = f"{page_number} of {page_count}"
         width = self._pagesize[0]
         self.drawCentredString(width / 2.0, 8 * mm, text)
 
@@ -290,6 +692,23 @@ def wetted_area_circular_m2(depth_mm, diameter_mm):
     return r * r * math.acos((r - h) / r) - (r - h) * math.sqrt(2 * r * h - h * h)
 
 
+def wetted_area_circular_np(depth_mm, diameter_mm):
+    """Vectorised ``wetted_area_circular_m2`` for an array of depths (m²)."""
+    h = np.asarray(depth_mm, dtype=np.float64) / 1000.0
+    if diameter_mm <= 0:
+        return np.zeros_like(h)
+
+    D = diameter_mm / 1000.0
+    r = D / 2.0
+    hc = np.clip(h, 0.0, D)  # keeps arccos/sqrt in-domain for masked entries
+    partial = r * r * np.arccos((r - hc) / r) - (r - hc) * np.sqrt(2 * r * hc - hc * hc)
+    return np.where(h <= 0, 0.0, np.where(h >= D, math.pi * r * r, partial))
+
+
+# Column order of the readings matrix used for averaging
+READING_KEYS = ("depth_meas_mm", "depth_meter_mm", "vel_meas_ms", "vel_meter_ms")
+
+
 def calculate_average_depth_velocity_and_flow(
     pipe_diameter_mm,
     depth_primary_meas,
@@ -299,31 +718,30 @@ def calculate_average_depth_velocity_and_flow(
     extra_readings,
 ):
     """Average all depth/velocity readings and calculate flow in L/s."""
-    d_meas = [depth_primary_meas] if depth_primary_meas > 0 else []
-    d_meter = [depth_primary_meter] if depth_primary_meter > 0 else []
-    v_meas = [vel_primary_meas] if vel_primary_meas > 0 else []
-    v_meter = [vel_primary_meter] if vel_primary_meter > 0 else []
-
-    for r in extra_readings or []:
-        if r.get("depth_meas_mm", 0) > 0:
-            d_meas.append(r["depth_meas_mm"])
-        if r.get("depth_meter_mm", 0) > 0:
-            d_meter.append(r["depth_meter_mm"])
-        if r.get("vel_meas_ms", 0.0) > 0:
-            v_meas.append(r["vel_meas_ms"])
-        if r.get("vel_meter_ms", 0.0) > 0:
-            v_meter.append(r["vel_meter_ms"])
-
-    def _avg(lst):
-        return float(sum(lst) / len(lst)) if lst else 0.0
-
-    avg_d_meas = _avg(d_meas)
-    avg_d_meter = _avg(d_meter)
-    avg_v_meas = _avg(v_meas)
-    avg_v_meter = _avg(v_meter)
-
-    area_meas = wetted_area_circular_m2(avg_d_meas, pipe_diameter_mm)
-    area_meter = wetted_area_circular_m2(avg_d_meter, pipe_diameter_mm)
+    readings = extra_readings or []
+    values = [depth_primary_meas, depth_primary_meter, vel_primary_meas, vel_primary_meter]
+
+    if not readings:
+        # A single row: plain floats beat the array setup below.
+        avg_d_meas, avg_d_meter, avg_v_meas, avg_v_meter = (
+            float(v) if v and v > 0 else 0.0 for v in values
+        )
+        area_meas = wetted_area_circular_m2(avg_d_meas, pipe_diameter_mm)
+        area_meter = wetted_area_circular_m2(avg_d_meter, pipe_diameter_mm)
+    else:
+        values.extend(r.get(k) or 0.0 for r in readings for k in READING_KEYS)
+        arr = np.asarray(values, dtype=np.float64).reshape(-1, len(READING_KEYS))
+
+        # Column-wise mean over the positive readings only
+        mask = arr > 0
+        counts = mask.sum(axis=0)
+        sums = np.where(mask, arr, 0.0).sum(axis=0)
+        avgs = np.divide(sums, counts, out=np.zeros(len(READING_KEYS)), where=counts > 0)
+        avg_d_meas, avg_d_meter, avg_v_meas, avg_v_meter = (float(v) for v in avgs)
+
+        area_meas, area_meter = (
+            float(a) for a in wetted_area_circular_np((avg_d_meas, avg_d_meter), pipe_diameter_mm)
+        )
 
     q_meas = area_meas * avg_v_meas * 1000.0
     q_meter = area_meter * avg_v_meter * 1000.0
@@ -343,34 +761,226 @@ def calculate_average_depth_velocity_and_flow(
 
 
 # ---------- Static site map for PDF ----------
+MAP_TILE_URL = "https://tile.openstreetmap.org/{z}/{x}/{y}.png"
+MAP_TILE_HEADERS = {"User-Agent": "EDS-Sewer-Install-Report/1.0 (site map for PDF reports)"}
+MAP_TILE_TIMEOUT_S = 10
+# Rendered maps also persist on disk so app restarts don't refetch their tiles.
+MAP_DISK_CACHE_DIR = Path(__file__).parent / ".cache" / "maps"
+MAP_DISK_CACHE_MAX_AGE_S = 7 * 86400
+MAP_DISK_CACHE_MAX_BYTES = 100 * 1024 * 1024
+
+
+@st.cache_resource(show_spinner=False)
+def _tile_http_session() -> requests.Session:
+    """Keep-alive HTTP session shared by all tile downloads."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=8)
+    session.mount("https://", adapter)
+    session.headers.update(MAP_TILE_HEADERS)
+    return session
+
+
+@st.cache_data(ttl=86400, max_entries=512, show_spinner=False)
+def _fetch_map_tile(url: str, timeout) -> bytes:
+    """Tile image bytes, kept in memory so neighbouring sites share their tiles.
+
+    Non-200 responses raise so that failures are not cached.
+    """
+    res = _tile_http_session().get(url, timeout=timeout)
+    res.raise_for_status()
+    return res.content
+
+
+if STATICMAP_AVAILABLE:
+
+    class PooledStaticMap(StaticMap):
+        """StaticMap that fetches its tiles over the shared keep-alive session.
+
+        staticmap already downloads tiles concurrently; reusing connections
+        saves a TCP/TLS handshake per tile, and tiles already fetched for a
+        nearby site are not downloaded again.
+        """
+
+        def get(self, url, **kwargs):
+            try:
+                return 200, _fetch_map_tile(url, kwargs.get("timeout"))
+            except requests.HTTPError as exc:
+                return exc.response.status_code, exc.response.content
+
+
+def _prune_disk_cache(directory: Path, max_age_s: float, max_bytes: int) -> None:
+    """Drop files older than ``max_age_s``, then the oldest until ``max_bytes`` fit."""
+    now = _time.time()
+    files = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                    if now - stat.st_mtime >= max_age_s:
+                        os.unlink(entry.path)
+                    else:
+                        files.append((stat.st_mtime, stat.st_size, entry.path))
+                except OSError:
+                    continue
+    except OSError:
+        return
+
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+        total -= size
+
+
+def _map_disk_cache_path(lat, lon, zoom, width_px, height_px) -> Path:
+    key = repr((lat, lon, zoom, width_px, height_px, MAP_TILE_URL)).encode("utf-8")
+    return MAP_DISK_CACHE_DIR / f"{hashlib.blake2b(key, digest_size=16).hexdigest()}.png"
+
+
+# Caches are keyed on coordinates rounded to 5 dp (~1 m, a few pixels at zoom
+# 19); the map itself is drawn at the exact ``_lat``/``_lon`` of the first site
+# that rendered it, so only sites within a metre of each other share an image.
+@st.cache_data(ttl=86400, max_entries=256, show_spinner=False)
+def _render_site_map_png(key_lat, key_lon, zoom, width_px, height_px, _lat, _lon) -> bytes:
+    """Render the static map as PNG bytes (cached across reruns and reports).
+
+    Failures raise so that they are not cached.
+    """
+    cache_path = _map_disk_cache_path(key_lat, key_lon, zoom, width_px, height_px)
+    try:
+        if _time.time() - cache_path.stat().st_mtime < MAP_DISK_CACHE_MAX_AGE_S:
+            return cache_path.read_bytes()
+    except OSError:
+        pass
+
+    m = PooledStaticMap(
+        width_px,
+        height_px,
+        url_template=MAP_TILE_URL,
+        tile_request_timeout=MAP_TILE_TIMEOUT_S,
+        headers=MAP_TILE_HEADERS,
+    )
+    marker = CircleMarker((_lon, _lat), "red", 12)
+    m.add_marker(marker)
+    im = m.render(zoom=zoom)
+    buf = io.BytesIO()
+    im.save(buf, format="PNG")
+    png = buf.getvalue()
+
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(png)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+    else:
+        _prune_disk_cache(MAP_DISK_CACHE_DIR, MAP_DISK_CACHE_MAX_AGE_S, MAP_DISK_CACHE_MAX_BYTES)
+    return png
+
+
+def _parse_coords(lat_str, lon_str):
+    """``(lat, lon)`` floats, or ``None`` when either value is not a number."""
+    try:
+        return float(str(lat_str).strip()), float(str(lon_str).strip())
+    except Exception:
+        return None
+
+
 def create_site_map_bytes(lat_str, lon_str, zoom=19, width_px=600, height_px=400):
     """Zoomed-in static map for PDF."""
     if not STATICMAP_AVAILABLE:
         return None
+    coords = _parse_coords(lat_str, lon_str)
+    if coords is None:
+        return None
+
+    lat, lon = coords
     try:
-        lat = float(str(lat_str).strip())
-        lon = float(str(lon_str).strip())
+        png = _render_site_map_png(round(lat, 5), round(lon, 5), zoom, width_px, height_px, lat, lon)
+        return io.BytesIO(png)
     except Exception:
         return None
 
+
+# ---------- Image ingest helpers ----------
+# Photos render at roughly 55 mm in the PDF, so 1600 px is ample at print DPI.
+PHOTO_MAX_PX = 1600
+PHOTO_JPEG_QUALITY = 82
+
+
+def downscale_image_record(record: dict, max_px: int = PHOTO_MAX_PX) -> dict:
+    """Return a copy of a photo/diagram record shrunk to at most ``max_px`` per side.
+
+    Photos are re-encoded as JPEG; images with transparency or PNG sources
+    (typically diagrams) stay PNG. Records that are already small enough or
+    cannot be decoded are returned unchanged.
+    """
+    data = get_photo_bytes(record)
+    if not PIL_AVAILABLE or not data:
+        return record
     try:
-        m = StaticMap(
-            width_px,
-            height_px,
-            url_template="https://tile.openstreetmap.org/{z}/{x}/{y}.png",
-        )
-        marker = CircleMarker((lon, lat), "red", 12)
-        m.add_marker(marker)
-        im = m.render(zoom=zoom)
-        buf = io.BytesIO()
-        im.save(buf, format="PNG")
-        buf.seek(0)
-        return buf
+        with Image.open(io.BytesIO(data)) as src:
+            if max(src.size) <= max_px:
+                return record
+            img = ImageOps.exif_transpose(src)
+            img.thumbnail((max_px, max_px), Image.LANCZOS)
+            out = io.BytesIO()
+            if src.format == "PNG" or img.mode in ("RGBA", "LA", "P"):
+                img.save(out, format="PNG", optimize=True)
+                mime = "image/png"
+            else:
+                img.convert("RGB").save(
+                    out, format="JPEG", quality=PHOTO_JPEG_QUALITY, optimize=True
+                )
+                mime = "image/jpeg"
     except Exception:
-        return None
+        return record
+
+    shrunk = {k: v for k, v in record.items() if not k.startswith("_")}
+    shrunk["data"] = out.getvalue()
+    shrunk["mime"] = mime
+    return shrunk
 
 
 # ---------- PDF layout helpers ----------
+@st.cache_resource(max_entries=64, show_spinner=False)
+def _photo_image_reader(fingerprint: str, _entry: dict):
+    """ImageReader for a photo/diagram, keyed by its ``photo_fingerprint``."""
+    # Records saved before uploads were downscaled can still carry
+    # full-size photos; shrink those so the PDF embeds print-sized images.
+    data = get_photo_bytes(downscale_image_record(_entry))
+    return ImageReader(io.BytesIO(data or b""))
+
+
+def _image_reader_for(entry: dict):
+    """Return the ImageReader for a photo/diagram record, reused across PDF builds.
+
+    Readers hold decoded pixels, so they live in a bounded shared cache
+    rather than on the (session-state) record.
+    """
+    fingerprint = photo_fingerprint(entry)
+    if fingerprint is None:
+        return ImageReader(io.BytesIO(b""))
+    return _photo_image_reader(fingerprint, entry)
+
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _map_image_reader(png: bytes):
+    """ImageReader per distinct site-map PNG, so its pixels are decoded once.
+
+    Shared across reruns and sessions; repeat exports of a site reuse it.
+    """
+    return ImageReader(io.BytesIO(png))
+
+
 def draw_header_bar(c, width, project, site_id, site_name):
     margin = 20 * mm
     c.setFillColor(HexColor("#3d9991"))
@@ -388,15 +998,31 @@ def draw_header_bar(c, width, project, site_id, site_name):
 
 
 def draw_footer(c, width, client, site_name):
+    """Stamp the page footer, laid out once per canvas as a reusable form XObject."""
+    client_short = (client or "")[:40]
+    site_short = (site_name or "")[:40]
+    right_text = f"Client: {client_short} | Site: {site_short}".strip(" |")
+
+    forms = getattr(c, "footer_forms", None)
+    if forms is None:
+        _draw_footer_text(c, width, right_text)
+        return
+    name = forms.get((width, right_text))
+    if name is None:
+        name = forms[(width, right_text)] = f"footer{len(forms)}"
+        c.beginForm(name)
+        _draw_footer_text(c, width, right_text)
+        c.endForm()
+    c.doForm(name)
+
+
+def _draw_footer_text(c, width, right_text):
     margin = 20 * mm
     y = 14 * mm
     c.setFont("Helvetica", 8)
     c.setFillGray(0.3)
 
     left_text = "Environmental Data Services – www.e-d-s.com.au | 1300 721 683"
-    client_short = (client or "")[:40]
-    site_short = (site_name or "")[:40]
-    right_text = f"Client: {client_short} | Site: {site_short}".strip(" |")
 
     c.drawString(margin, y, left_text)
     c.drawRightString(width - margin, y, right_text)
@@ -411,6 +1037,12 @@ def draw_section_title(c, text, x, y):
     c.line(x, y - 2, x + 170 * mm, y - 2)
 
 
+@functools.lru_cache(maxsize=4096)
+def _text_width(text: str, font_size: float) -> float:
+    """Helvetica width of ``text``; words like units and client names repeat a lot."""
+    return stringWidth(text, "Helvetica", font_size)
+
+
 def draw_wrapped_kv(
     c,
     label,
@@ -442,42 +1074,73 @@ def draw_wrapped_kv(
     if not words:
         return y - line_height
 
-    line = ""
-    y_out = y
+    # Measure each word once and accumulate the line width incrementally.
+    space_w = _text_width(" ", font_size)
+    lines = []
+    line_words = []
+    line_w = 0.0
     for w in words:
-        test_line = (line + " " + w).strip()
-        w_width = stringWidth(test_line, "Helvetica", font_size)
-        if w_width <= max_text_width:
-            line = test_line
+        w_width = _text_width(w, font_size)
+        test_w = line_w + space_w + w_width if line_words else w_width
+        if test_w <= max_text_width:
+            line_words.append(w)
+            line_w = test_w
         else:
-            c.drawString(text_x, y_out, line)
-            y_out -= line_height
-            line = w
-    if line:
-        c.drawString(text_x, y_out, line)
-        y_out -= line_height
+            lines.append(" ".join(line_words))
+            line_words = [w]
+            line_w = w_width
+    if line_words:
+        lines.append(" ".join(line_words))
+
+    # One text object for the whole value rather than one per line.
+    text = c.beginText(text_x, y)
+    if len(lines) > 1:
+        text.setLeading(line_height)
+    for line in lines:
+        text.textLine(line)
+    c.drawText(text)
+    y_out = y - line_height * len(lines)
 
     return y_out - 0.3 * line_height
 
 
 # ---------- Per-site PDF pages ----------
+# Hydraulic yes/no flags in the order the "Hydraulics" lines print them.
+PDF_YES_NO = ("No", "Yes")
+HYDRO_FLAG_KEYS = (
+    "hydro_drops",
+    "hydro_bends",
+    "hydro_junctions",
+    "hydro_surcharge_risk",
+    "hydro_backwater_risk",
+)
+HYDRO_LINE1_TEMPLATE = (
+    "Turbulence: {} | Drops near meter: {}; Bends near meter: {}; Junctions within 5D: {}"
+)
+HYDRO_LINE2_TEMPLATE = "Surcharge risk: {}; Backwater risk: {}"
+
+
 def draw_site_main_page(c, site, width, height):
     margin = 22 * mm
     line_height = 6 * mm
+    project = site.get("project_name", "Project")
+    site_id = site.get("site_id", "")
+    site_name = site.get("site_name", "")
+    client = site.get("client", "")
 
     draw_header_bar(
         c,
         width,
-        site.get("project_name", "Project"),
-        site.get("site_id", ""),
-        site.get("site_name", ""),
+        project,
+        site_id,
+        site_name,
     )
     y = height - HEADER_CONTENT_OFFSET
 
     # 1. Project details
     draw_section_title(c, "1. Project", margin, y)
     y -= line_height * 1.5
-    y = draw_wrapped_kv(c, "Client", site.get("client", ""), margin, y, line_height)
+    y = draw_wrapped_kv(c, "Client", client, margin, y, line_height)
     y = draw_wrapped_kv(
         c, "Catchment", site.get("catchment", ""), margin, y, line_height
     )
@@ -571,17 +1234,9 @@ def draw_site_main_page(c, site, width, height):
         line_height,
     )
 
-    drops = "Yes" if site.get("hydro_drops") else "No"
-    bends = "Yes" if site.get("hydro_bends") else "No"
-    juncs = "Yes" if site.get("hydro_junctions") else "No"
-    surch = "Yes" if site.get("hydro_surcharge_risk") else "No"
-    backw = "Yes" if site.get("hydro_backwater_risk") else "No"
-    hydro_line1 = (
-        f"Turbulence: {site.get('hydro_turbulence_level','')} | "
-        f"Drops near meter: {drops}; Bends near meter: {bends}; "
-        f"Junctions within 5D: {juncs}"
-    )
-    hydro_line2 = f"Surcharge risk: {surch}; Backwater risk: {backw}"
+    flags = [PDF_YES_NO[bool(site.get(k))] for k in HYDRO_FLAG_KEYS]
+    hydro_line1 = HYDRO_LINE1_TEMPLATE.format(site.get("hydro_turbulence_level", ""), *flags[:3])
+    hydro_line2 = HYDRO_LINE2_TEMPLATE.format(*flags[3:])
     y = draw_wrapped_kv(c, "Hydraulics (1)", hydro_line1, margin, y, line_height)
     y = draw_wrapped_kv(c, "Hydraulics (2)", hydro_line2, margin, y, line_height)
     y = draw_wrapped_kv(
@@ -593,26 +1248,30 @@ def draw_site_main_page(c, site, width, height):
         line_height,
     )
 
-    draw_footer(c, width, site.get("client", ""), site.get("site_name", ""))
+    draw_footer(c, width, client, site_name)
     c.showPage()
 
 
 def draw_site_commissioning_page(c, site, width, height):
     margin = 22 * mm
     line_height = 6 * mm
+    project = site.get("project_name", "Project")
+    site_id = site.get("site_id", "")
+    site_name = site.get("site_name", "")
+    client = site.get("client", "")
     min_y_threshold = 40 * mm  # Minimum Y before forcing page break
     
     def check_page_break(y_current, space_needed=10 * mm):
         """Check if we need a page break and create one if necessary."""
         if y_current - space_needed < min_y_threshold:
-            draw_footer(c, width, site.get("client", ""), site.get("site_name", ""))
+            draw_footer(c, width, client, site_name)
             c.showPage()
             draw_header_bar(
                 c,
                 width,
-                site.get("project_name", "Project"),
-                site.get("site_id", ""),
-                site.get("site_name", ""),
+                project,
+                site_id,
+                site_name,
             )
             return height - HEADER_CONTENT_OFFSET
         return y_current
@@ -620,9 +1279,9 @@ def draw_site_commissioning_page(c, site, width, height):
     draw_header_bar(
         c,
         width,
-        site.get("project_name", "Project"),
-        site.get("site_id", ""),
-        site.get("site_name", ""),
+        project,
+        site_id,
+        site_name,
     )
     y = height - HEADER_CONTENT_OFFSET
 
@@ -849,7 +1508,7 @@ def draw_site_commissioning_page(c, site, width, height):
     y -= line_height * 0.5
 
     # Diagrams, map and reporting – next page
-    draw_footer(c, width, site.get("client", ""), site.get("site_name", ""))
+    draw_footer(c, width, client, site_name)
     c.showPage()
 
     margin = 22 * mm
@@ -857,9 +1516,9 @@ def draw_site_commissioning_page(c, site, width, height):
     draw_header_bar(
         c,
         width,
-        site.get("project_name", "Project"),
-        site.get("site_id", ""),
-        site.get("site_name", ""),
+        project,
+        site_id,
+        site_name,
     )
     y = height - HEADER_CONTENT_OFFSET
     max_w = width - 2 * margin
@@ -874,8 +1533,7 @@ def draw_site_commissioning_page(c, site, width, height):
         draw_section_title(c, f"{section_idx}. Manhole / Site Diagram", margin, y)
         y -= line_height * 1.5
 
-        img_bytes = io.BytesIO(diagram["data"])
-        img = ImageReader(img_bytes)
+        img = _image_reader_for(diagram)
         iw, ih = img.getSize()
         scale = min(max_w / iw, max_diag_h / ih)
         w = iw * scale
@@ -888,7 +1546,6 @@ def draw_site_commissioning_page(c, site, width, height):
             y - h,
             width=w,
             height=h,
-            preserveAspectRatio=True,
             mask="auto",
         )
 
@@ -903,21 +1560,21 @@ def draw_site_commissioning_page(c, site, width, height):
     map_buf = create_site_map_bytes(site.get("gps_lat"), site.get("gps_lon"), zoom=19)
     if map_buf:
         if y - max_map_h < 40 * mm:
-            draw_footer(c, width, site.get("client", ""), site.get("site_name", ""))
+            draw_footer(c, width, client, site_name)
             c.showPage()
             draw_header_bar(
                 c,
                 width,
-                site.get("project_name", "Project"),
-                site.get("site_id", ""),
-                site.get("site_name", ""),
+                project,
+                site_id,
+                site_name,
             )
             y = height - HEADER_CONTENT_OFFSET
 
         draw_section_title(c, f"{section_idx}. Site location map", margin, y)
         y -= line_height * 1.5
 
-        map_img = ImageReader(map_buf)
+        map_img = _map_image_reader(map_buf.getvalue())
         iw, ih = map_img.getSize()
         scale = min(max_w / iw, max_map_h / ih)
         w = iw * scale
@@ -930,7 +1587,6 @@ def draw_site_commissioning_page(c, site, width, height):
             y - h,
             width=w,
             height=h,
-            preserveAspectRatio=True,
             mask="auto",
         )
 
@@ -939,14 +1595,14 @@ def draw_site_commissioning_page(c, site, width, height):
 
     # Reporting details
     if y < 60 * mm:
-        draw_footer(c, width, site.get("client", ""), site.get("site_name", ""))
+        draw_footer(c, width, client, site_name)
         c.showPage()
         draw_header_bar(
             c,
             width,
-            site.get("project_name", "Project"),
-            site.get("site_id", ""),
-            site.get("site_name", ""),
+            project,
+            site_id,
+            site_name,
         )
         y = height - HEADER_CONTENT_OFFSET
 
@@ -967,7 +1623,7 @@ def draw_site_commissioning_page(c, site, width, height):
     )
     y = draw_wrapped_kv(c, "", reviewed_line, margin, y, line_height, width_label=5 * mm)
 
-    draw_footer(c, width, site.get("client", ""), site.get("site_name", ""))
+    draw_footer(c, width, client, site_name)
     c.showPage()
 
 
@@ -978,6 +1634,10 @@ def draw_site_photos(c, site, photos, width, height):
 
     margin = 22 * mm
     line_height = 6 * mm
+    project = site.get("project_name", "Project")
+    site_id = site.get("site_id", "")
+    site_name = site.get("site_name", "")
+    client = site.get("client", "")
     max_w = width - 2 * margin
     max_h = 55 * mm
 
@@ -985,9 +1645,9 @@ def draw_site_photos(c, site, photos, width, height):
         draw_header_bar(
             c,
             width,
-            site.get("project_name", "Project"),
-            site.get("site_id", ""),
-            site.get("site_name", ""),
+            project,
+            site_id,
+            site_name,
         )
         y0 = height - HEADER_CONTENT_OFFSET
         c.setFont("Helvetica-Bold", 11)
@@ -1002,12 +1662,11 @@ def draw_site_photos(c, site, photos, width, height):
 
     for p in photos:
         if y - max_h < 25 * mm:
-            draw_footer(c, width, site.get("client", ""), site.get("site_name", ""))
+            draw_footer(c, width, client, site_name)
             c.showPage()
             y = start_page(first=False)
 
-        img_bytes = io.BytesIO(p["data"])
-        img = ImageReader(img_bytes)
+        img = _image_reader_for(p)
         iw, ih = img.getSize()
         scale = min(max_w / iw, max_h / ih)
         w = iw * scale
@@ -1020,7 +1679,6 @@ def draw_site_photos(c, site, photos, width, height):
             y - h,
             width=w,
             height=h,
-            preserveAspectRatio=True,
             mask="auto",
         )
 
@@ -1030,40 +1688,49 @@ def draw_site_photos(c, site, photos, width, height):
 
         y = y - h - 10 * mm
 
-    draw_footer(c, width, site.get("client", ""), site.get("site_name", ""))
+    draw_footer(c, width, client, site_name)
     c.showPage()
 
 
-def create_pdf_bytes(sites):
-    buf = io.BytesIO()
-    c = NumberedCanvas(buf, pagesize=A4)
-    width, height = A4
+def _draw_site_pages(c, site, width, height):
+    draw_site_main_page(c, site, width, height)
+    draw_site_commissioning_page(c, site, width, height)
+    draw_site_photos(c, site, site.get("photos", []) or [], width, height)
+
 
+def _render_sites_sequential(sites) -> bytes:
+    c = NumberedCanvas(io.BytesIO(), pagesize=A4)
+    width, height = A4
     for s in sites:
-        draw_site_main_page(c, s, width, height)
-        draw_site_commissioning_page(c, s, width, height)
-        draw_site_photos(c, s, s.get("photos", []) or [], width, height)
+        _draw_site_pages(c, s, width, height)
+    return c.finish()
 
-    c.save()
-    buf.seek(0)
-    pdf_bytes = buf.getvalue()
 
-    # Try to embed a JSON metadata attachment (site data) for reliable round-trip
+def create_pdf_bytes(sites):
+    """Render ``sites`` into one PDF, embedding their data as ``site_data.json``."""
+    # ReportLab drawing holds the GIL, so all sites go on one canvas; render
+    # threads measured no faster and added a split-and-merge pass.
+    pdf_bytes = _render_sites_sequential(sites)
+    PyPDF2 = _pypdf()
+    if not sites or PyPDF2 is None:
+        return io.BytesIO(pdf_bytes)
+
+    # Embed a JSON metadata attachment (site data) for reliable round-trip
     try:
-        from PyPDF2 import PdfReader, PdfWriter
-
-        reader = PdfReader(io.BytesIO(pdf_bytes))
-        writer = PdfWriter()
+        reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+        writer = PyPDF2.PdfWriter()
         for p in reader.pages:
             writer.add_page(p)
 
-        # Prepare compact metadata (exclude large binary fields)
+        # Prepare compact metadata (exclude large binary fields and the
+        # private loader/cache fields such as _filepath)
         meta_sites = []
         for s in sites:
             copy = {
                 k: v
                 for k, v in s.items()
                 if k not in ("verification_readings", "photos", "diagram")
+                and not k.startswith("_")
             }
             meta_sites.append(copy)
 
@@ -1083,85 +1750,168 @@ def create_pdf_bytes(sites):
         return out
 
 
+# Single-site PDFs persist on disk under a hash of the site state, so unchanged
+# sites skip ReportLab across reruns, sessions and restarts.
+SITE_PDF_CACHE_DIR = Path(__file__).parent / ".cache" / "sites"
+SITE_PDF_CACHE_MAX_AGE_S = MAP_DISK_CACHE_MAX_AGE_S
+SITE_PDF_CACHE_MAX_BYTES = 200 * 1024 * 1024
+# Bump whenever the PDF layout changes so stale cached PDFs are not served.
+SITE_PDF_LAYOUT_VERSION = 1
+
+
+def _site_pdf_cache_path(site: dict) -> Path:
+    key = json.dumps(
+        [site_fingerprint(site), STATICMAP_AVAILABLE, SITE_PDF_LAYOUT_VERSION]
+    ).encode("utf-8")
+    return SITE_PDF_CACHE_DIR / f"{hashlib.blake2b(key, digest_size=16).hexdigest()}.pdf"
+
+
+def site_pdf_bytes(site: dict) -> tuple:
+    """``(pdf_bytes, complete)`` for one site, from the disk cache or rendered and stored.
+
+    A site whose map could not be fetched is rendered without it, returned
+    with ``complete=False`` and not stored, so the map is tried again next time.
+    """
+    cache_path = _site_pdf_cache_path(site)
+    try:
+        if _time.time() - cache_path.stat().st_mtime < SITE_PDF_CACHE_MAX_AGE_S:
+            return cache_path.read_bytes(), True
+    except OSError:
+        pass
+
+    coords = _parse_coords(site.get("gps_lat"), site.get("gps_lon"))
+    map_missing = (
+        STATICMAP_AVAILABLE
+        and coords is not None
+        and create_site_map_bytes(*coords, zoom=19) is None
+    )
+    pdf = create_pdf_bytes([site]).getvalue()
+    if map_missing:
+        return pdf, False
+
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(pdf)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+    else:
+        _prune_disk_cache(SITE_PDF_CACHE_DIR, SITE_PDF_CACHE_MAX_AGE_S, SITE_PDF_CACHE_MAX_BYTES)
+    return pdf, True
+
+
+class IncompleteSitePdf(Exception):
+    """Raised inside cached PDF helpers so a map-less render is not memoised."""
+
+    def __init__(self, pdf: bytes):
+        super().__init__("site map unavailable")
+        self.pdf = pdf
+
+
+def complete_site_pdf_bytes(site: dict) -> bytes:
+    """PDF bytes for one site, raising ``IncompleteSitePdf`` if its map is missing.
+
+    Meant for ``st.cache_data`` helpers: the exception keeps the map-less
+    render out of their cache.
+    """
+    pdf, complete = site_pdf_bytes(site)
+    if not complete:
+        raise IncompleteSitePdf(pdf)
+    return pdf
+
+
+def discard_cached_site_pdf(site: dict) -> None:
+    """Remove ``site``'s PDF from the disk cache, if present."""
+    try:
+        _site_pdf_cache_path(site).unlink()
+    except OSError:
+        pass
+
+
 # ---------- Photo helpers ----------
+# Hashed inline: xxh3_128 covers 64 MiB of photos in ~7 ms, and a thread pool
+# measured no faster, so there is nothing to parallelise.
+def prime_photo_fingerprints(records) -> None:
+    """Compute missing ``_h`` fingerprints for records that have a payload."""
+    for record in records:
+        if record.get("_h") is None and get_photo_bytes(record) is not None:
+            photo_fingerprint(record)
+
+
 def merge_photo_records(existing_photos, new_photos):
     """Merge existing and newly uploaded photo records without duplication.
 
-    Photos are deduplicated by hashing their binary payload so that renaming an
+    Photos are deduplicated by fingerprinting their binary payload (a fast
+    non-cryptographic hash; there is no adversary here) so that renaming an
     existing image updates its metadata instead of creating a second copy. All
     outputs have trimmed, non-empty captions and their ``data`` value is
     normalised to ``bytes`` to keep equality checks reliable.
     """
 
-    def _ensure_bytes(payload):
-        if isinstance(payload, bytes):
-            return payload
-        if isinstance(payload, bytearray):
-            return bytes(payload)
-        if isinstance(payload, memoryview):
-            return payload.tobytes()
-        return None
-
     merged_by_hash: dict[str, dict] = {}
     insertion_order: list[str] = []
 
-    def _store(copy: dict, data_bytes: bytes | None, *, fallback_key: str) -> None:
-        if data_bytes is None:
+    def _store(copy: dict, digest: str | None, *, fallback_key: str) -> None:
+        if digest is None:
             if fallback_key not in merged_by_hash:
                 insertion_order.append(fallback_key)
             merged_by_hash[fallback_key] = copy
             return
 
-        digest = hashlib.sha256(data_bytes).hexdigest()
         if digest not in merged_by_hash:
             insertion_order.append(digest)
             merged_by_hash[digest] = copy
         else:
             merged_by_hash[digest].update(copy)
 
-    for idx, photo in enumerate(existing_photos or []):
-        if not isinstance(photo, dict):
-            continue
-        copy = photo.copy()
-        copy_name = (copy.get("name") or "").strip()
-        copy["name"] = copy_name or "Site photo"
-        data_bytes = _ensure_bytes(copy.get("data"))
-        if data_bytes is not None:
-            copy["data"] = data_bytes
-        _store(copy, data_bytes, fallback_key=f"existing-{idx}")
-
+    # Each record is rebuilt once with its caption already normalised, so the
+    # caller's dicts are never mutated and no per-field fix-ups are needed.
+    existing_copies = [
+        (idx, {**photo, "name": (photo.get("name") or "").strip() or "Site photo"})
+        for idx, photo in enumerate(existing_photos or [])
+        if isinstance(photo, dict)
+    ]
+    new_copies = []
     for idx, photo in enumerate(new_photos or []):
-        if not isinstance(photo, dict):
-            continue
-        data_bytes = _ensure_bytes(photo.get("data"))
-        if data_bytes is None:
-            continue
+        if isinstance(photo, dict):
+            cleaned_name = (photo.get("name") or "").strip()
+            new_copies.append((idx, cleaned_name, {**photo, "name": cleaned_name or "Site photo"}))
+    prime_photo_fingerprints(
+        [copy for _, copy in existing_copies] + [copy for _, _, copy in new_copies]
+    )
+
+    for idx, copy in existing_copies:
+        _store(copy, photo_fingerprint(copy), fallback_key=f"existing-{idx}")
 
-        digest = hashlib.sha256(data_bytes).hexdigest()
-        cleaned_name = (photo.get("name") or "").strip()
+    for idx, cleaned_name, copy in new_copies:
+        digest = photo_fingerprint(copy)
+        if digest is None:
+            continue
 
         if digest in merged_by_hash:
             existing = merged_by_hash[digest]
             if cleaned_name:
                 existing["name"] = cleaned_name
-            if photo.get("mime"):
-                existing["mime"] = photo["mime"]
+            if copy.get("mime"):
+                existing["mime"] = copy["mime"]
         else:
-            copy = photo.copy()
-            copy["data"] = data_bytes
-            copy["name"] = cleaned_name or "Site photo"
-            _store(copy, data_bytes, fallback_key=f"new-{idx}")
+            _store(copy, digest, fallback_key=f"new-{idx}")
 
     return [merged_by_hash[key] for key in insertion_order]
 
 
 # ---------- GitHub storage helpers ----------
+_SLUG_NONALNUM_RX = re.compile(r"[^A-Za-z0-9]+")
+_SLUG_COLLAPSE_RX = re.compile(r"-+")
+
+
 def slugify_path_component(value: str | None, fallback: str = "item") -> str:
     text = (value or "").strip()
     if not text:
         text = fallback
-    text = re.sub(r"[^A-Za-z0-9]+", "-", text)
-    text = re.sub(r"-+", "-", text)
+    text = _SLUG_NONALNUM_RX.sub("-", text)
+    text = _SLUG_COLLAPSE_RX.sub("-", text)
     text = text.strip("-").lower()
     return text or fallback.lower()
 
@@ -1175,16 +1925,32 @@ def generate_site_storage_path(site: dict, base_folder: str = "reports") -> str:
     return f"{folder}/{project_slug}/{site_slug}.json"
 
 
-def _coerce_bytes_or_none(payload):
-    if isinstance(payload, bytes):
-        return payload
-    if isinstance(payload, bytearray):
-        return bytes(payload)
-    if isinstance(payload, memoryview):
-        return payload.tobytes()
+def _byte_view_or_none(payload) -> memoryview | None:
+    """Read-only byte view of a bytes-like payload, without copying it."""
+    if isinstance(payload, (bytes, bytearray, memoryview)):
+        return memoryview(payload).cast("B")
     return None
 
 
+# Multiple of 3, so chunk encodings concatenate without inner padding.
+B64_CHUNK_BYTES = 57 * 1024
+
+
+def b64encode_text(payload) -> str:
+    """Base64-encode a bytes-like payload to ``str`` in bounded chunks.
+
+    Large PDFs never have a full-size intermediate ``bytes`` encoding alive
+    next to the final string.
+    """
+    view = memoryview(payload).cast("B")
+    if view.nbytes <= B64_CHUNK_BYTES:
+        return _b64.b64encode(view).decode("ascii")
+    return "".join(
+        _b64.b64encode(view[start : start + B64_CHUNK_BYTES]).decode("ascii")
+        for start in range(0, view.nbytes, B64_CHUNK_BYTES)
+    )
+
+
 def serialise_site_for_storage(site: dict) -> dict:
     cleaned: dict[str, object] = {}
     for key, value in site.items():
@@ -1199,13 +1965,13 @@ def serialise_site_for_storage(site: dict) -> dict:
     for photo in site.get("photos") or []:
         if not isinstance(photo, dict):
             continue
-        data_bytes = _coerce_bytes_or_none(photo.get("data"))
+        data_bytes = get_photo_bytes(photo)
         entry = {
             "name": (photo.get("name") or "").strip() or "Site photo",
             "mime": photo.get("mime"),
         }
         if data_bytes:
-            entry["sha256"] = hashlib.sha256(data_bytes).hexdigest()
+            entry["sha256"] = photo_sha256(photo)
             entry["size_bytes"] = len(data_bytes)
         photos_meta.append(entry)
     if photos_meta:
@@ -1213,13 +1979,13 @@ def serialise_site_for_storage(site: dict) -> dict:
 
     diagram = site.get("diagram")
     if isinstance(diagram, dict):
-        diag_bytes = _coerce_bytes_or_none(diagram.get("data"))
+        diag_bytes = get_photo_bytes(diagram)
         diag_entry = {
             "name": diagram.get("name"),
             "mime": diagram.get("mime"),
         }
         if diag_bytes:
-            diag_entry["sha256"] = hashlib.sha256(diag_bytes).hexdigest()
+            diag_entry["sha256"] = photo_sha256(diagram)
             diag_entry["size_bytes"] = len(diag_bytes)
         cleaned["diagram_metadata"] = diag_entry
 
@@ -1227,17 +1993,53 @@ def serialise_site_for_storage(site: dict) -> dict:
     return cleaned
 
 
+def dump_bundle_json(bundle: dict) -> bytes:
+    """Serialise a GitHub bundle as indented, key-sorted UTF-8 JSON bytes."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            bundle,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
+    return json.dumps(bundle, indent=2, sort_keys=True).encode("utf-8")
+
+
 def build_site_report_bundle(site: dict, pdf_bytes: bytes | bytearray | memoryview) -> dict:
-    pdf_payload = _coerce_bytes_or_none(pdf_bytes)
+    pdf_payload = _byte_view_or_none(pdf_bytes)
     if pdf_payload is None:
         raise TypeError("pdf_bytes must be bytes-like")
     return {
         "bundle_version": 1,
         "site": serialise_site_for_storage(site),
-        "pdf_base64": base64.b64encode(pdf_payload).decode("ascii"),
+        "pdf_base64": b64encode_text(pdf_payload),
     }
 
 
+@st.cache_resource(show_spinner=False)
+def _github_http_session(token: str) -> requests.Session:
+    """Keep-alive HTTP session for the GitHub API, one per token.
+
+    Uploading several sites then pays the TLS handshake to api.github.com once.
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8)
+    session.mount("https://", adapter)
+    return session
+
+
+@st.cache_resource(show_spinner=False)
+def configured_github_token() -> Optional[str]:
+    """GitHub token from Streamlit secrets or the environment, resolved once per process."""
+    try:
+        token_secret = (
+            st.secrets.get("github_report_token")
+            if hasattr(st, "secrets")
+            else None
+        )
+    except Exception:
+        token_secret = None
+    return token_secret or os.getenv("GITHUB_REPORT_TOKEN") or os.getenv("GITHUB_TOKEN")
+
+
 def upload_site_report_to_github(
     site: dict,
     pdf_bytes: bytes | bytearray | memoryview,
@@ -1264,8 +2066,7 @@ def upload_site_report_to_github(
     owner, repo = repo_full_name.split("/", 1)
     storage_path = generate_site_storage_path(site, base_folder=base_folder)
     bundle = build_site_report_bundle(site, pdf_bytes)
-    bundle_json = json.dumps(bundle, indent=2, sort_keys=True)
-    encoded_content = base64.b64encode(bundle_json.encode("utf-8")).decode("ascii")
+    encoded_content = b64encode_text(dump_bundle_json(bundle))
 
     headers = {
         "Authorization": f"Bearer {resolved_token}",
@@ -1273,39 +2074,42 @@ def upload_site_report_to_github(
         "X-GitHub-Api-Version": "2022-11-28",
     }
 
-    sess = session or requests.Session()
+    sess = session or _github_http_session(resolved_token)
     url = f"https://api.github.com/repos/{owner}/{repo}/contents/{quote(storage_path, safe='/')}"
     params = {"ref": branch} if branch else None
 
-    response = sess.get(url, headers=headers, params=params)
-    if response.status_code == 200:
-        try:
-            existing = response.json()
-        except Exception as exc:
-            raise RuntimeError("Failed to decode GitHub response when checking existing file") from exc
-        sha = existing.get("sha") or existing.get("content", {}).get("sha")
-        commit_prefix = "Update"
-    elif response.status_code == 404:
-        sha = None
-        commit_prefix = "Add"
-    else:
-        raise RuntimeError(
-            f"GitHub API responded with {response.status_code} while checking existing file: {response.text}"
-        )
-
     site_name = (site.get("site_name") or "installation").strip() or "installation"
-    commit_message = f"{commit_prefix} installation report for {site_name}"
-
     payload = {
-        "message": commit_message,
+        "message": f"Add installation report for {site_name}",
         "content": encoded_content,
     }
     if branch:
         payload["branch"] = branch
-    if sha:
-        payload["sha"] = sha
 
+    # Most uploads are new files, so PUT straight away; GitHub rejects the write
+    # with 409/422 asking for the blob sha only if the file already exists.
     put_response = sess.put(url, headers=headers, json=payload)
+    if put_response.status_code in (409, 422) and "sha" in (put_response.text or ""):
+        # The object media type returns the metadata without the base64 content.
+        response = sess.get(
+            url,
+            headers={**headers, "Accept": "application/vnd.github.object+json"},
+            params=params,
+        )
+        if response.status_code != 200:
+            raise RuntimeError(
+                f"GitHub API responded with {response.status_code} while checking existing file: {response.text}"
+            )
+        try:
+            existing = response.json()
+        except Exception as exc:
+            raise RuntimeError("Failed to decode GitHub response when checking existing file") from exc
+        sha = existing.get("sha") or existing.get("content", {}).get("sha")
+        if sha:
+            payload["sha"] = sha
+        payload["message"] = f"Update installation report for {site_name}"
+        put_response = sess.put(url, headers=headers, json=payload)
+
     if put_response.status_code not in (200, 201):
         raise RuntimeError(
             f"GitHub API responded with {put_response.status_code} while uploading report: {put_response.text}"
@@ -1323,67 +2127,145 @@ def upload_site_report_to_github(
     }
 
 
+# ---------- Site records ----------
+def build_site_record(values: dict, *, verification_readings, diagram, photos) -> dict:
+    """Assemble the stored site record from the form's widget values.
+
+    Dates and times are stringified and the check differences and hydraulic
+    averages are derived here, so this only runs when the form is submitted.
+    """
+    record = dict(values)
+    for key in ("install_date", "prepared_date", "reviewed_date"):
+        record[key] = str(values[key])
+    record["install_time"] = values["install_time"].strftime("%H:%M")
+
+    depth_diff = values["depth_check_meter_mm"] - values["depth_check_meas_mm"]
+    record["depth_check_diff_mm"] = depth_diff
+    record["depth_check_within_tol"] = abs(depth_diff) <= values["depth_check_tolerance_mm"]
+    record["vel_check_diff_ms"] = values["vel_check_meter_ms"] - values["vel_check_meas_ms"]
+    record["verification_readings"] = verification_readings
+    record["diagram"] = diagram
+    record["photos"] = photos
+
+    record.update(
+        calculate_average_depth_velocity_and_flow(
+            values["pipe_diameter_mm"],
+            values["depth_check_meas_mm"],
+            values["depth_check_meter_mm"],
+            values["vel_check_meas_ms"],
+            values["vel_check_meter_ms"],
+            verification_readings,
+        )
+    )
+    return record
+
+
 # ---------- Excel export ----------
+SITE_EXPORT_COLS = (
+    "project_name",
+    "client",
+    "catchment",
+    "site_id",
+    "site_name",
+    "client_asset_id",
+    "gis_id",
+    "install_date",
+    "install_time",
+    "meter_model",
+    "pipe_diameter_mm",
+    "pipe_material",
+    "pipe_shape",
+    "depth_to_invert_mm",
+    "gps_lat",
+    "gps_lon",
+    "logging_interval_min",
+    "comms_method",
+    "comms_verified",
+    "calibration_rating",
+    "avg_depth_meas_mm",
+    "avg_depth_meter_mm",
+    "avg_vel_meas_ms",
+    "avg_vel_meter_ms",
+    "flow_meas_lps",
+    "flow_meter_lps",
+    "flow_diff_lps",
+    "flow_diff_percent",
+    "hydro_turbulence_level",
+    "hydro_drops",
+    "hydro_bends",
+    "hydro_junctions",
+    "hydro_surcharge_risk",
+    "hydro_backwater_risk",
+    "modelling_notes",
+    "data_quality_risks",
+)
+
+
 def create_excel_bytes(sites):
-    flat_sites = []
-    for s in sites:
-        copy = {
-            k: v
-            for k, v in s.items()
-            if k not in ("verification_readings", "photos", "diagram")
-        }
-        flat_sites.append(copy)
-
-    df = pd.DataFrame(flat_sites)
-    cols = [
-        "project_name",
-        "client",
-        "catchment",
-        "site_id",
-        "site_name",
-        "client_asset_id",
-        "gis_id",
-        "install_date",
-        "install_time",
-        "meter_model",
-        "pipe_diameter_mm",
-        "pipe_material",
-        "pipe_shape",
-        "depth_to_invert_mm",
-        "gps_lat",
-        "gps_lon",
-        "logging_interval_min",
-        "comms_method",
-        "comms_verified",
-        "calibration_rating",
-        "avg_depth_meas_mm",
-        "avg_depth_meter_mm",
-        "avg_vel_meas_ms",
-        "avg_vel_meter_ms",
-        "flow_meas_lps",
-        "flow_meter_lps",
-        "flow_diff_lps",
-        "flow_diff_percent",
-        "hydro_turbulence_level",
-        "hydro_drops",
-        "hydro_bends",
-        "hydro_junctions",
-        "hydro_surcharge_risk",
-        "hydro_backwater_risk",
-        "modelling_notes",
-        "data_quality_risks",
-    ]
-    cols = [c for c in cols if c in df.columns]
-    df = df[cols]
+    # pandas is only needed for exports, so keep it off the cold-start path
+    import pandas as pd
+
+    # Project straight onto the export columns instead of building a wide frame
+    # of every key and dropping most of it afterwards.
+    cols = [c for c in SITE_EXPORT_COLS if any(c in s for s in sites)]
+    records = [tuple(s.get(c) for c in cols) for s in sites]
+    df = pd.DataFrame.from_records(records, columns=cols)
 
     buf = io.BytesIO()
-    with pd.ExcelWriter(buf, engine="openpyxl") as w:
+    engine = _excel_engine()
+    # in_memory keeps xlsxwriter off temp files. constant_memory is not used:
+    # pandas writes cells column by column, which that mode would truncate.
+    # strings_to_urls=False skips the per-string URL scan and keeps text as
+    # plain cells, as the openpyxl fallback writes them.
+    engine_kwargs = (
+        {"options": {"in_memory": True, "strings_to_urls": False}}
+        if engine == "xlsxwriter"
+        else None
+    )
+    with pd.ExcelWriter(buf, engine=engine, engine_kwargs=engine_kwargs) as w:
         df.to_excel(w, sheet_name="Sites Summary", index=False)
     buf.seek(0)
     return buf
 
 
 # ---------- Streamlit helpers ----------
+@st.cache_data(max_entries=32, show_spinner=False)
+def _cached_site_pdf_bytes(fingerprint: str, _site: dict) -> bytes:
+    return complete_site_pdf_bytes(_site)
+
+
+def cached_site_pdf_bytes(fingerprint: str, site: dict) -> bytes:
+    """PDF bytes for one site, rebuilt only when its ``site_fingerprint`` changes.
+
+    A render without its map is returned but not memoised, so it is retried.
+    """
+    try:
+        return _cached_site_pdf_bytes(fingerprint, site)
+    except IncompleteSitePdf as exc:
+        return exc.pdf
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def cached_sites_excel_bytes(fingerprints: tuple, _sites: list) -> bytes:
+    """Excel workbook bytes for ``sites``, keyed on their fingerprints."""
+    return create_excel_bytes(_sites).getvalue()
+
+
+def deferred_download_button(label: str, build, *, key: str, **kwargs) -> None:
+    """Offer a download whose bytes are only built once the user asks for them.
+
+    ``st.download_button`` needs its data at render time, so the first click on
+    ``label`` just marks ``key`` as requested; ``build()`` then runs on that and
+    later reruns to feed the real download button.
+    """
+    requested = st.session_state.setdefault("_requested_downloads", set())
+    if key not in requested:
+        if not st.button(label, key=f"prep_{key}"):
+            return
+        requested.add(key)
+    st.download_button(f"⬇️ {label}", data=build(), key=key, **kwargs)
+
+
 def safe_rerun():
     """Try to rerun the Streamlit app in a safe, backwards-compatible way."""
     rerun_fn = getattr(st, "rerun", None)
@@ -1415,73 +2297,116 @@ def safe_rerun():
             return
 
 
+@st.cache_resource(show_spinner=False)
+def _geolocator():
+    """Single Nominatim client shared across reruns (None if geopy is missing)."""
+    Nominatim = _nominatim_class()
+    return Nominatim(user_agent="eds_sewer_reporter") if Nominatim is not None else None
+
+
+@st.cache_data(ttl=86400, max_entries=256, show_spinner=False)
+def _reverse_geocode(lat_r: float, lon_r: float) -> str:
+    """Reverse-geocode rounded coordinates (cached). Failures raise so they are not cached."""
+    location = _geolocator().reverse(f"{lat_r}, {lon_r}", language="en")
+    return location.address if location else ""
+
+
 def get_address_from_coords(lat: float, lon: float) -> str:
     """Use reverse geocoding (Nominatim) to get street address from lat/lon."""
+    if _geolocator() is None:
+        return ""
     try:
-        from geopy.geocoders import Nominatim
-
-        geolocator = Nominatim(user_agent="eds_sewer_reporter")
-        location = geolocator.reverse(f"{lat}, {lon}", language="en")
-        return location.address if location else ""
+        # ~1 m granularity, so small map nudges reuse the previous lookup
+        return _reverse_geocode(round(float(lat), 5), round(float(lon), 5))
     except Exception:
         return ""
 
 
+PDF_LABEL_MAP = {
+    "project_name": ["Project", "Project name"],
+    "client": ["Client"],
+    "site_name": ["Site / manhole name", "Site name", "Site"],
+    "site_id": ["Site ID", "SiteID", "Manhole", "Manhole number"],
+    "client_asset_id": ["Client asset ID"],
+    "gis_id": ["GIS ID"],
+    "install_date": ["Install date", "Installed on", "Install Date"],
+    "install_time": ["Install time", "Install Time"],
+    "gps_lat": ["GPS latitude", "GPS Latitude", "Lat"],
+    "gps_lon": ["GPS longitude", "GPS Longitude", "Lon"],
+    "manhole_location_desc": ["Location description", "Location"],
+    "prepared_by": ["Prepared by"],
+}
+
+# lowercased label -> (field key, preference rank among that field's labels)
+_PDF_LABEL_LOOKUP = {}
+for _key, _variants in PDF_LABEL_MAP.items():
+    for _rank, _label in enumerate(_variants):
+        _PDF_LABEL_LOOKUP.setdefault(_label.lower(), (_key, _rank))
+
+# One alternation over every label, longest first so "Project name" wins over
+# "Project" at the same position; the text is scanned once for all fields. The
+# value sits in a lookahead so labels later on the same line are still seen.
+_PDF_LABEL_RX = re.compile(
+    r"(?P<label>"
+    + "|".join(re.escape(lbl) for lbl in sorted(_PDF_LABEL_LOOKUP, key=len, reverse=True))
+    + r")[:\s]+(?=(?P<value>[^\r\n]+))",
+    re.IGNORECASE,
+)
+_COORD_PAIR_RX = re.compile(r"([+-]?\d+\.\d+)\s*[,:\s]\s*([+-]?\d+\.\d+)")
+
+
+def extract_labelled_fields(text: str) -> dict:
+    """Pull ``Label: value`` pairs out of extracted PDF text in a single pass."""
+    best = {}
+    for m in _PDF_LABEL_RX.finditer(text):
+        val = m.group("value").strip().rstrip(";.,")
+        if not val:
+            continue
+        key, rank = _PDF_LABEL_LOOKUP[m.group("label").lower()]
+        # Earlier labels in PDF_LABEL_MAP take precedence; otherwise first match wins.
+        if key not in best or rank < best[key][0]:
+            best[key] = (rank, val)
+    return {key: val for key, (_rank, val) in best.items()}
+
+
+# The prefill fields all sit on a report's first page; stop extracting text
+# well before a long multi-site PDF has been walked end to end.
+PDF_PARSE_MAX_CHARS = 50_000
+
+
 def parse_pdf_report(file_bytes: bytes) -> dict:
     """Attempt to parse a PDF report generated by this app and return a
     dictionary of site fields to prepopulate the form.
     """
-    try:
-        from PyPDF2 import PdfReader
-    except Exception:
+    PyPDF2 = _pypdf()
+    if PyPDF2 is None:
         return {"_error": "missing_pyPDF2"}
 
     try:
-        reader = PdfReader(io.BytesIO(file_bytes))
+        reader = PyPDF2.PdfReader(io.BytesIO(file_bytes))
         text_pages = []
+        extracted = 0
         for p in reader.pages:
             try:
                 txt = p.extract_text() or ""
             except Exception:
                 txt = ""
             text_pages.append(txt)
+            extracted += len(txt)
+            if extracted >= PDF_PARSE_MAX_CHARS:
+                break
         full_text = "\n".join(text_pages)
     except Exception:
         return {"_error": "parse_failed"}
 
-    label_map = {
-        "project_name": ["Project", "Project name"],
-        "client": ["Client"],
-        "site_name": ["Site / manhole name", "Site name", "Site"],
-        "site_id": ["Site ID", "SiteID", "Manhole", "Manhole number"],
-        "client_asset_id": ["Client asset ID"],
-        "gis_id": ["GIS ID"],
-        "install_date": ["Install date", "Installed on", "Install Date"],
-        "install_time": ["Install time", "Install Time"],
-        "gps_lat": ["GPS latitude", "GPS Latitude", "Lat"],
-        "gps_lon": ["GPS longitude", "GPS Longitude", "Lon"],
-        "manhole_location_desc": ["Location description", "Location"],
-        "prepared_by": ["Prepared by"],
-    }
+    if not full_text.strip():
+        # Scanned/image-only PDF: nothing for the label search to find
+        return {}
 
-    parsed = {}
-    import re
-
-    for key, variants in label_map.items():
-        found = None
-        for label in variants:
-            pattern = rf"{re.escape(label)}[:\s]+(.+)$"
-            m = re.search(pattern, full_text, flags=re.IGNORECASE | re.MULTILINE)
-            if m:
-                val = m.group(1).strip()
-                val = val.rstrip(";.,")
-                found = val
-                break
-        if found:
-            parsed[key] = found
+    parsed = extract_labelled_fields(full_text)
 
     if "gps_lat" not in parsed or "gps_lon" not in parsed:
-        m = re.search(r"([+-]?\d+\.\d+)\s*[,:\s]\s*([+-]?\d+\.\d+)", full_text)
+        m = _COORD_PAIR_RX.search(full_text)
         if m:
             parsed.setdefault("gps_lat", m.group(1))
             parsed.setdefault("gps_lon", m.group(2))
@@ -1489,6 +2414,68 @@ def parse_pdf_report(file_bytes: bytes) -> dict:
     return parsed
 
 
+# ---------- Form option lists ----------
+# Built once at import rather than on every rerun; the {value: index} maps give
+# O(1) selectbox defaults.
+ACCESS_TYPE_OPTS = ("", "On-road", "Off-road", "Easement", "Private property")
+ACCESS_TYPE_IDX = {v: i for i, v in enumerate(ACCESS_TYPE_OPTS)}
+
+PIPE_MATERIAL_OPTS = ("", "VC", "RC", "PVC", "DICL", "Steel", "HDPE", "Other")
+PIPE_MATERIAL_IDX = {v: i for i, v in enumerate(PIPE_MATERIAL_OPTS)}
+
+PIPE_SHAPE_OPTS = ("", "Circular", "Egg", "Box", "Oval", "Arch", "Other")
+PIPE_SHAPE_IDX = {v: i for i, v in enumerate(PIPE_SHAPE_OPTS)}
+
+HYDRO_TURBULENCE_OPTS = ("", "Low", "Moderate", "High")
+HYDRO_TURBULENCE_IDX = {v: i for i, v in enumerate(HYDRO_TURBULENCE_OPTS)}
+
+METER_MODEL_OPTS = (
+    "",
+    "Detectronic MSFM AV",
+    "Detectronic MSFM4",
+    "LIDoTT AV",
+    "Other",
+)
+METER_MODEL_IDX = {v: i for i, v in enumerate(METER_MODEL_OPTS)}
+
+TZ_OPTS = ("", "AEST", "AEDT", "ACST", "AWST", "UTC")
+TZ_IDX = {v: i for i, v in enumerate(TZ_OPTS)}
+
+COMMS_METHOD_OPTS = (
+    "",
+    "SIM – Telstra",
+    "SIM – Optus",
+    "SIM – Vodafone",
+    "Ethernet",
+    "LoRaWAN",
+    "Modbus",
+    "Other",
+)
+COMMS_METHOD_IDX = {v: i for i, v in enumerate(COMMS_METHOD_OPTS)}
+
+YES_NO_OPTS = ("", "Yes", "No")
+YES_NO_IDX = {v: i for i, v in enumerate(YES_NO_OPTS)}
+
+RATING_OPTS = ("", "Good", "Fair", "Poor")
+RATING_IDX = {v: i for i, v in enumerate(RATING_OPTS)}
+
+REPORT_SORT_OPTS = ("Date (newest)", "Date (oldest)", "Project", "Site")
+SAVED_REPORTS_PAGE_SIZE = 20
+SAVED_REPORT_DETAILS = (
+    ("Project Details", (("Project", "project_name"), ("Client", "client"), ("Catchment", "catchment"))),
+    ("Site Details", (("Site", "site_name"), ("Site ID", "site_id"), ("Install Date", "install_date"))),
+    ("Equipment", (("Meter", "meter_model"), ("Logger", "logger_serial"), ("Rating", "calibration_rating"))),
+)
+
+
+def _sel_index(idx_map: dict, val, other_idx: int, empty_idx: int = 0) -> int:
+    """Selectbox index for ``val``: its own slot, "Other" for free text, else ``empty_idx``."""
+    hit = idx_map.get(val)
+    if hit is not None:
+        return hit
+    return other_idx if val else empty_idx
+
+
 # ---------- Streamlit UI ----------
 st.set_page_config(
     page_title="EDS Sewer Install Wizzard",
@@ -1969,7 +2956,7 @@ with st.expander("Upload completed PDF report to pre-fill form (optional)", expa
                     continue
                 if v and (not draft_vals.get(k)):
                     draft_vals[k] = v
-            st.session_state["draft_site"] = draft_vals
+            st.session_state["draft_site"] = normalize_draft(draft_vals)
             st.success("PDF parsed — form pre-populated. You can edit and save this draft.")
             safe_rerun()
 
@@ -2088,14 +3075,7 @@ with st.form("site_form", clear_on_submit=False):
             gis_id = st.text_input("GIS ID", value=draft.get("gis_id", ""))
 
             install_date_default = draft.get("install_date")
-            if isinstance(install_date_default, str):
-                try:
-                    install_date_default = date.fromisoformat(install_date_default)
-                except ValueError:
-                    install_date_default = date.today()
-            elif isinstance(install_date_default, date):
-                pass
-            else:
+            if not isinstance(install_date_default, date):
                 install_date_default = date.today()
 
             install_date = st.date_input(
@@ -2104,15 +3084,7 @@ with st.form("site_form", clear_on_submit=False):
             )
 
             install_time_default = draft.get("install_time")
-            if isinstance(install_time_default, str):
-                try:
-                    h, m = map(int, install_time_default.split(":"))
-                    install_time_default = time(h, m)
-                except Exception:
-                    install_time_default = time(9, 0)
-            elif isinstance(install_time_default, time):
-                pass
-            else:
+            if not isinstance(install_time_default, time):
                 install_time_default = time(9, 0)
 
             install_time = st.time_input(
@@ -2160,20 +3132,11 @@ with st.form("site_form", clear_on_submit=False):
         st.markdown("#### Access & permits")
         c_acc1, c_acc2, c_acc3 = st.columns([1, 1, 2])
         with c_acc1:
-            access_options = [
-                "",
-                "On-road",
-                "Off-road",
-                "Easement",
-                "Private property",
-            ]
             access_val = draft.get("access_type", "")
-            access_index = (
-                access_options.index(access_val) if access_val in access_options else 0
-            )
+            access_index = ACCESS_TYPE_IDX.get(access_val, 0)
             access_type = st.selectbox(
                 "Access type",
-                access_options,
+                ACCESS_TYPE_OPTS,
                 index=access_index,
             )
         with c_acc2:
@@ -2215,31 +3178,17 @@ with st.form("site_form", clear_on_submit=False):
                 value=int(draft.get("depth_to_invert_mm", 0)),
             )
         with ph2:
-            pipe_material_opts = [
-                "",
-                "VC",
-                "RC",
-                "PVC",
-                "DICL",
-                "Steel",
-                "HDPE",
-                "Other",
-            ]
             pm_val = draft.get("pipe_material", "")
-            pm_index = (
-                pipe_material_opts.index(pm_val)
-                if pm_val in pipe_material_opts
-                else (len(pipe_material_opts) - 1 if pm_val else 0)
-            )
+            pm_index = _sel_index(PIPE_MATERIAL_IDX, pm_val, len(PIPE_MATERIAL_OPTS) - 1)
             pipe_material_choice = st.selectbox(
                 "Pipe material",
-                pipe_material_opts,
+                PIPE_MATERIAL_OPTS,
                 index=pm_index,
             )
             if pipe_material_choice == "Other":
                 pipe_material = st.text_input(
                     "Other pipe material",
-                    value=pm_val if pm_val not in pipe_material_opts else "",
+                    value=pm_val if pm_val not in PIPE_MATERIAL_IDX else "",
                 )
             else:
                 pipe_material = pipe_material_choice
@@ -2250,36 +3199,26 @@ with st.form("site_form", clear_on_submit=False):
                 value=int(draft.get("depth_to_soffit_mm", 0)),
             )
         with ph3:
-            pipe_shape_opts = ["", "Circular", "Egg", "Box", "Oval", "Arch", "Other"]
             ps_val = draft.get("pipe_shape", "")
-            ps_index = (
-                pipe_shape_opts.index(ps_val)
-                if ps_val in pipe_shape_opts
-                else (len(pipe_shape_opts) - 1 if ps_val else 0)
-            )
+            ps_index = _sel_index(PIPE_SHAPE_IDX, ps_val, len(PIPE_SHAPE_OPTS) - 1)
             pipe_shape_choice = st.selectbox(
                 "Pipe shape",
-                pipe_shape_opts,
+                PIPE_SHAPE_OPTS,
                 index=ps_index,
             )
             if pipe_shape_choice == "Other":
                 pipe_shape = st.text_input(
                     "Other pipe shape",
-                    value=ps_val if ps_val not in pipe_shape_opts else "",
+                    value=ps_val if ps_val not in PIPE_SHAPE_IDX else "",
                 )
             else:
                 pipe_shape = pipe_shape_choice
         with ph4:
-            hydro_turbulence_options = ["", "Low", "Moderate", "High"]
             ht_val = draft.get("hydro_turbulence_level", "")
-            ht_index = (
-                hydro_turbulence_options.index(ht_val)
-                if ht_val in hydro_turbulence_options
-                else 0
-            )
+            ht_index = HYDRO_TURBULENCE_IDX.get(ht_val, 0)
             hydro_turbulence_level = st.selectbox(
                 "Turbulence level at sensor",
-                hydro_turbulence_options,
+                HYDRO_TURBULENCE_OPTS,
                 index=ht_index,
             )
 
@@ -2330,28 +3269,17 @@ with st.form("site_form", clear_on_submit=False):
         st.markdown("#### Meter selection & positioning")
         m1, m2, m3 = st.columns(3)
         with m1:
-            meter_model_opts = [
-                "",
-                "Detectronic MSFM AV",
-                "Detectronic MSFM4",
-                "LIDoTT AV",
-                "Other",
-            ]
             mm_val = draft.get("meter_model", "")
-            mm_index = (
-                meter_model_opts.index(mm_val)
-                if mm_val in meter_model_opts
-                else (len(meter_model_opts) - 1 if mm_val else 1)
-            )
+            mm_index = _sel_index(METER_MODEL_IDX, mm_val, len(METER_MODEL_OPTS) - 1, empty_idx=1)
             meter_model_choice = st.selectbox(
                 "Meter model",
-                meter_model_opts,
+                METER_MODEL_OPTS,
                 index=mm_index,
             )
             if meter_model_choice == "Other":
                 meter_model = st.text_input(
                     "Other meter model",
-                    value=mm_val if mm_val not in meter_model_opts else "",
+                    value=mm_val if mm_val not in METER_MODEL_IDX else "",
                 )
             else:
                 meter_model = meter_model_choice
@@ -2423,36 +3351,21 @@ with st.form("site_form", clear_on_submit=False):
                 value=int(draft.get("logging_interval_min", 5)),
             )
         with cfg2:
-            tz_options = ["", "AEST", "AEDT", "ACST", "AWST", "UTC"]
             tz_val = draft.get("timezone", "AEST")
-            tz_index = tz_options.index(tz_val) if tz_val in tz_options else 1
-            timezone = st.selectbox("Time zone", tz_options, index=tz_index)
+            tz_index = TZ_IDX.get(tz_val, 1)
+            timezone = st.selectbox("Time zone", TZ_OPTS, index=tz_index)
         with cfg3:
-            comms_method_opts = [
-                "",
-                "SIM – Telstra",
-                "SIM – Optus",
-                "SIM – Vodafone",
-                "Ethernet",
-                "LoRaWAN",
-                "Modbus",
-                "Other",
-            ]
             cm_val = draft.get("comms_method", "")
-            cm_index = (
-                comms_method_opts.index(cm_val)
-                if cm_val in comms_method_opts
-                else (len(comms_method_opts) - 1 if cm_val else 0)
-            )
+            cm_index = _sel_index(COMMS_METHOD_IDX, cm_val, len(COMMS_METHOD_OPTS) - 1)
             comms_method_choice = st.selectbox(
                 "Comms method",
-                comms_method_opts,
+                COMMS_METHOD_OPTS,
                 index=cm_index,
             )
             if comms_method_choice == "Other":
                 comms_method = st.text_input(
                     "Other comms method",
-                    value=cm_val if cm_val not in comms_method_opts else "",
+                    value=cm_val if cm_val not in COMMS_METHOD_IDX else "",
                 )
             else:
                 comms_method = comms_method_choice
@@ -2518,12 +3431,11 @@ with st.form("site_form", clear_on_submit=False):
 
         c_com1, c_com2 = st.columns(2)
         with c_com1:
-            cv_options = ["", "Yes", "No"]
             cv_val = draft.get("comms_verified", "")
-            cv_index = cv_options.index(cv_val) if cv_val in cv_options else 0
+            cv_index = YES_NO_IDX.get(cv_val, 0)
             comms_verified = st.selectbox(
                 "Comms verified on platform?",
-                cv_options,
+                YES_NO_OPTS,
                 index=cv_index,
             )
         with c_com2:
@@ -2555,12 +3467,16 @@ with st.form("site_form", clear_on_submit=False):
             key="extra_readings_count_slider",
             help="Adjust to add or remove verification reading cards for depth and velocity checks.",
         )
-        if st.session_state.get("extra_readings_count") != int(slider_value):
+        # The slider sits inside the form, so a new count arrives with a submit.
+        # The reading cards below are drawn in this same run, so resize them
+        # here instead of forcing a second full rerun, and hold the submission
+        # back so the new cards can be filled in first.
+        readings_resized = st.session_state.get("extra_readings_count") != int(slider_value)
+        if readings_resized:
             st.session_state["extra_readings_count"] = int(slider_value)
             st.session_state["_extra_count_seed"] = id(
                 st.session_state.get("draft_site")
             )
-            safe_rerun()
 
         extra_count = int(
             st.session_state.get("extra_readings_count", int(slider_value))
@@ -2641,12 +3557,11 @@ with st.form("site_form", clear_on_submit=False):
         st.markdown("#### Calibration & modelling notes")
         cal1, cal2 = st.columns([1, 2])
         with cal1:
-            rating_options = ["", "Good", "Fair", "Poor"]
             cr_val = draft.get("calibration_rating", "")
-            cr_index = rating_options.index(cr_val) if cr_val in rating_options else 0
+            cr_index = RATING_IDX.get(cr_val, 0)
             calibration_rating = st.selectbox(
                 "Overall rating",
-                rating_options,
+                RATING_OPTS,
                 index=cr_index,
             )
         with cal2:
@@ -2721,24 +3636,29 @@ with st.form("site_form", clear_on_submit=False):
             accept_multiple_files=True,
             key="photo_files",
         )
+        keep_original_images = st.checkbox(
+            "Keep full-resolution originals",
+            value=False,
+            help=(
+                f"By default new photos and diagrams are downscaled to {PHOTO_MAX_PX} px "
+                "on save, which keeps reports and PDFs small."
+            ),
+        )
 
         st.caption(
             "Short, descriptive captions make it easier for the modelling team to triage later."
         )
 
-        new_photos = []
+        # Only the captions are collected here; the photo records themselves
+        # are built on submit.
+        new_photo_captions = []
         for i, f in enumerate(photo_files or []):
-            cap = st.text_input(
-                f"Photo {i+1} name / description",
-                value=f.name,
-                key=f"photo_caption_{f.name}_{i}",
-            )
-            new_photos.append(
-                {
-                    "name": cap,
-                    "data": f.getvalue(),
-                    "mime": f.type,
-                }
+            new_photo_captions.append(
+                st.text_input(
+                    f"Photo {i+1} name / description",
+                    value=f.name,
+                    key=f"photo_caption_{f.name}_{i}",
+                )
             )
 
         existing_photos_raw = draft.get("photos", []) or []
@@ -2765,10 +3685,11 @@ with st.form("site_form", clear_on_submit=False):
                     )
 
                 with st.expander("Preview", expanded=False):
-                    if photo.get("data"):
+                    preview_bytes = get_photo_bytes(photo)
+                    if preview_bytes:
                         try:
                             st.image(
-                                photo["data"],
+                                preview_bytes,
                                 caption=(edited_name or default_name),
                                 use_column_width=True,
                             )
@@ -2794,12 +3715,12 @@ with st.form("site_form", clear_on_submit=False):
             st.session_state["draft_site"]["photos"] = existing_photos
         draft["photos"] = existing_photos
 
-        if existing_photos and new_photos:
+        if existing_photos and new_photo_captions:
             st.info(
                 f"{len(existing_photos)} existing photo(s) plus "
-                f"{len(new_photos)} new photo(s) will be stored."
+                f"{len(new_photo_captions)} new photo(s) will be stored."
             )
-        elif existing_photos and not new_photos:
+        elif existing_photos and not new_photo_captions:
             st.info(
                 f"{len(existing_photos)} existing photo(s) are ready for export. "
                 "Upload new photos or untick above if you need changes."
@@ -2819,14 +3740,7 @@ with st.form("site_form", clear_on_submit=False):
             )
 
             prepared_date_default = draft.get("prepared_date")
-            if isinstance(prepared_date_default, str):
-                try:
-                    prepared_date_default = date.fromisoformat(prepared_date_default)
-                except ValueError:
-                    prepared_date_default = date.today()
-            elif isinstance(prepared_date_default, date):
-                pass
-            else:
+            if not isinstance(prepared_date_default, date):
                 prepared_date_default = date.today()
 
             prepared_date = st.date_input(
@@ -2844,14 +3758,7 @@ with st.form("site_form", clear_on_submit=False):
             )
 
             reviewed_date_default = draft.get("reviewed_date")
-            if isinstance(reviewed_date_default, str):
-                try:
-                    reviewed_date_default = date.fromisoformat(reviewed_date_default)
-                except ValueError:
-                    reviewed_date_default = date.today()
-            elif isinstance(reviewed_date_default, date):
-                pass
-            else:
+            if not isinstance(reviewed_date_default, date):
                 reviewed_date_default = date.today()
 
             reviewed_date = st.date_input(
@@ -2883,28 +3790,28 @@ with st.form("site_form", clear_on_submit=False):
         )
 
     # ---------- Handle form submit ----------
-    if submitted:
-        derived = calculate_average_depth_velocity_and_flow(
-            pipe_diameter_mm,
-            depth_check_meas_mm,
-            depth_check_meter_mm,
-            vel_check_meas_ms,
-            vel_check_meter_ms,
-            updated_extra,
-        )
-
+    if submitted and not readings_resized:
         if diagram_file is not None:
             diagram_obj = {
                 "name": diagram_name or diagram_file.name,
                 "data": diagram_file.getvalue(),
                 "mime": diagram_file.type,
             }
+            if not keep_original_images:
+                diagram_obj = downscale_image_record(diagram_obj)
         else:
             diagram_obj = existing_diagram
 
+        new_photos = [
+            {"name": cap, "data": f.getvalue(), "mime": f.type}
+            for f, cap in zip(photo_files or [], new_photo_captions)
+        ]
+        if not keep_original_images:
+            new_photos = [downscale_image_record(p) for p in new_photos]
+
         all_photos = merge_photo_records(existing_photos, new_photos)
 
-        site_record = {
+        form_values = {
             "project_name": project_name,
             "client": client,
             "catchment": catchment,
@@ -2912,8 +3819,8 @@ with st.form("site_form", clear_on_submit=False):
             "site_id": site_id,
             "client_asset_id": client_asset_id,
             "gis_id": gis_id,
-            "install_date": str(install_date),
-            "install_time": install_time.strftime("%H:%M"),
+            "install_date": install_date,
+            "install_time": install_time,
             "gps_lat": gps_lat,
             "gps_lon": gps_lon,
             "site_address": site_address,
@@ -2958,11 +3865,8 @@ with st.form("site_form", clear_on_submit=False):
             "depth_check_meas_mm": depth_check_meas_mm,
             "depth_check_meter_mm": depth_check_meter_mm,
             "depth_check_tolerance_mm": depth_check_tolerance_mm,
-            "depth_check_diff_mm": depth_check_diff_mm,
-            "depth_check_within_tol": depth_check_within_tol,
             "vel_check_meas_ms": vel_check_meas_ms,
             "vel_check_meter_ms": vel_check_meter_ms,
-            "vel_check_diff_ms": vel_check_meter_ms - vel_check_meas_ms,
             "comms_verified": comms_verified,
             "comms_verified_at": comms_verified_at,
             "zero_depth_check_done": zero_depth_check_done,
@@ -2970,7 +3874,6 @@ with st.form("site_form", clear_on_submit=False):
             "reference_device_type": reference_device_type,
             "reference_device_id": reference_device_id,
             "reference_reading_desc": reference_reading_desc,
-            "verification_readings": updated_extra,
             "calibration_rating": calibration_rating,
             "calibration_comment": calibration_comment,
             "modelling_notes": modelling_notes,
@@ -2980,28 +3883,29 @@ with st.form("site_form", clear_on_submit=False):
             "chk_depth_range_ok": chk_depth_range_ok,
             "chk_logging_started": chk_logging_started,
             "chk_comms_checked_platform": chk_comms_checked_platform,
-            "diagram": diagram_obj,
-            "photos": all_photos,
             "prepared_by": prepared_by,
             "prepared_position": prepared_position,
-            "prepared_date": str(prepared_date),
+            "prepared_date": prepared_date,
             "reviewed_by": reviewed_by,
             "reviewed_position": reviewed_position,
-            "reviewed_date": str(reviewed_date),
+            "reviewed_date": reviewed_date,
         }
-        site_record.update(derived)
+        site_record = build_site_record(
+            form_values,
+            verification_readings=updated_extra,
+            diagram=diagram_obj,
+            photos=all_photos,
+        )
 
         # Enforce uniqueness: site name only
-        for i, s in enumerate(sites):
-            if (
-                i != (edit_index if edit_index is not None else -1)
-                and s.get("site_name") == site_name
-            ):
-                st.error(
-                    "A site with this **site / manhole name** already exists. "
-                    "Please adjust the name or load that site for editing."
-                )
-                st.stop()
+        sites_by_name = {s.get("site_name"): i for i, s in enumerate(sites)}
+        dup = sites_by_name.get(site_name)
+        if dup is not None and dup != edit_index:
+            st.error(
+                "A site with this **site / manhole name** already exists. "
+                "Please adjust the name or load that site for editing."
+            )
+            st.stop()
 
         if edit_index is None:
             st.session_state["sites"].append(site_record)
@@ -3017,7 +3921,7 @@ with st.form("site_form", clear_on_submit=False):
             st.session_state["sites"][edit_index] = site_record
             st.success("Site updated.")
 
-        st.session_state["draft_site"] = site_record
+        st.session_state["draft_site"] = normalize_draft(site_record)
         st.session_state["extra_readings_count"] = len(updated_extra)
         st.session_state["_extra_count_seed"] = id(st.session_state.get("draft_site"))
         st.session_state["edit_index"] = None
@@ -3025,14 +3929,16 @@ with st.form("site_form", clear_on_submit=False):
 # ---------- Current sites / edit / delete ----------
 st.subheader("Current Sites in Project")
 
+# Shared by the edit and PDF-export pickers below
+site_labels = [f"{i+1}. {s['project_name']} – {s['site_name']}" for i, s in enumerate(sites)]
+
 if not sites:
     st.info("No sites added yet. Use the form above to add your first site.")
 else:
-    options = [f"{i+1}. {s['project_name']} – {s['site_name']}" for i, s in enumerate(sites)]
     idx = st.selectbox(
         "Select a site to edit / delete",
         options=range(len(sites)),
-        format_func=lambda i: options[i],
+        format_func=site_labels.__getitem__,
         key="site_select",
     )
 
@@ -3079,7 +3985,7 @@ else:
     col_exp1, col_exp2 = st.columns([1, 1])
 
     with col_exp1:
-        excel_bytes = create_excel_bytes(sites)
+        excel_bytes = cached_sites_excel_bytes(tuple(site_fingerprint(s) for s in sites), sites)
         st.download_button(
             "⬇️ Export all sites to Excel",
             data=excel_bytes,
@@ -3092,11 +3998,10 @@ else:
         pdf_idx = st.selectbox(
             "Select a site for PDF export",
             options=range(len(sites)),
-            format_func=lambda i: f"{i+1}. {sites[i]['project_name']} – {sites[i]['site_name']}",
+            format_func=site_labels.__getitem__,
             key="pdf_site_select",
         )
-        pdf_buffer = create_pdf_bytes([sites[pdf_idx]])
-        pdf_bytes = pdf_buffer.getvalue()
+        pdf_bytes = cached_site_pdf_bytes(site_fingerprint(sites[pdf_idx]), sites[pdf_idx])
         proj = sites[pdf_idx].get("project_name", "project").replace(" ", "_")
         sname = sites[pdf_idx].get("site_name", "site").replace(" ", "_")
         st.download_button(
@@ -3136,7 +4041,7 @@ else:
         quick_idx = st.selectbox(
             "Select a saved report",
             options=range(len(saved_reports)),
-            format_func=lambda i: quick_options[i],
+            format_func=quick_options.__getitem__,
             key="saved_report_quick_select",
         )
 
@@ -3176,7 +4081,7 @@ else:
     with col_search2:
         sort_by = st.selectbox(
             "Sort by",
-            ["Date (newest)", "Date (oldest)", "Project", "Site"],
+            REPORT_SORT_OPTS,
             key="sort_reports",
         )
     with col_search3:
@@ -3187,69 +4092,68 @@ else:
             st.session_state["_flash_message"] = "Saved reports list refreshed."
             safe_rerun()
     
-    # Filter reports based on search
-    filtered_reports = saved_reports
+    # Sort (memoised per loaded list), then filter based on search
+    filtered_reports = sort_saved_reports(saved_reports, sort_by)
     if search_term:
         search_lower = search_term.lower()
-        filtered_reports = [
-            r for r in saved_reports
-            if search_lower in r.get("project_name", "").lower()
-            or search_lower in r.get("site_name", "").lower()
-            or search_lower in r.get("client", "").lower()
-            or search_lower in r.get("site_id", "").lower()
-        ]
-    
-    # Sort reports
-    if sort_by == "Date (oldest)":
-        filtered_reports = list(reversed(filtered_reports))
-    elif sort_by == "Project":
-        filtered_reports = sorted(
-            filtered_reports,
-            key=lambda r: r.get("project_name", "").lower()
-        )
-    elif sort_by == "Site":
-        filtered_reports = sorted(
-            filtered_reports,
-            key=lambda r: r.get("site_name", "").lower()
-        )
+        filtered_reports = [r for r in filtered_reports if search_lower in r["_search_blob"]]
     
     if not filtered_reports:
         st.warning(f"No reports found matching '{search_term}'")
     else:
         st.caption(f"Showing {len(filtered_reports)} report(s)")
-        
+
+        # Only the current page of expanders is rendered; a new search or sort
+        # starts again from the first page.
+        page_size = SAVED_REPORTS_PAGE_SIZE
+        total_pages = max(1, math.ceil(len(filtered_reports) / page_size))
+        view_key = (search_term, sort_by)
+        if st.session_state.get("_reports_view_key") != view_key:
+            st.session_state["_reports_view_key"] = view_key
+            st.session_state["reports_page"] = 0
+        page = min(st.session_state.get("reports_page", 0), total_pages - 1)
+        if total_pages > 1:
+            col_prev, col_page, col_next = st.columns([1, 2, 1])
+            with col_prev:
+                if st.button("◀ Previous", key="reports_prev", disabled=page == 0):
+                    st.session_state["reports_page"] = page - 1
+                    safe_rerun()
+            with col_next:
+                if st.button("Next ▶", key="reports_next", disabled=page >= total_pages - 1):
+                    st.session_state["reports_page"] = page + 1
+                    safe_rerun()
+            with col_page:
+                st.caption(f"Page {page + 1} of {total_pages}")
+        page_reports = filtered_reports[page * page_size:(page + 1) * page_size]
+
         # Display reports in an expandable list
-        for i, report in enumerate(filtered_reports):
+        for i, report in enumerate(page_reports):
             summary = get_report_summary(report)
             filename = report.get("_filename", "unknown.json")
-            
+            mtime_ns = report.get("_mtime_ns")
+            export_stem = (
+                f"{(report.get('project_name') or 'project').replace(' ', '_')}_"
+                f"{(report.get('site_name') or 'site').replace(' ', '_')}"
+            )
+
             with st.expander(f"📄 {summary}"):
-                col_info1, col_info2, col_info3 = st.columns([2, 2, 2])
-                
-                with col_info1:
-                    st.markdown("**Project Details**")
-                    st.text(f"Project: {report.get('project_name', 'N/A')}")
-                    st.text(f"Client: {report.get('client', 'N/A')}")
-                    st.text(f"Catchment: {report.get('catchment', 'N/A')}")
-                
-                with col_info2:
-                    st.markdown("**Site Details**")
-                    st.text(f"Site: {report.get('site_name', 'N/A')}")
-                    st.text(f"Site ID: {report.get('site_id', 'N/A')}")
-                    st.text(f"Install Date: {report.get('install_date', 'N/A')}")
-                
-                with col_info3:
-                    st.markdown("**Equipment**")
-                    st.text(f"Meter: {report.get('meter_model', 'N/A')}")
-                    st.text(f"Logger: {report.get('logger_serial', 'N/A')}")
-                    st.text(f"Rating: {report.get('calibration_rating', 'N/A')}")
-                
+                for col_info, (heading, fields) in zip(
+                    st.columns([2, 2, 2]), SAVED_REPORT_DETAILS
+                ):
+                    with col_info:
+                        # One preformatted block per column instead of a widget per line
+                        st.markdown(f"**{heading}**")
+                        st.text("\n".join(f"{label}: {report.get(key, 'N/A')}" for label, key in fields))
+
                 # Location
-                if report.get("gps_lat") and report.get("gps_lon"):
+                gps_lat, gps_lon = report.get("gps_lat"), report.get("gps_lon")
+                if gps_lat and gps_lon:
                     st.markdown("**Location**")
-                    st.text(f"GPS: {report.get('gps_lat')}, {report.get('gps_lon')}")
-                    if report.get("site_address"):
-                        st.text(f"Address: {report.get('site_address')}")
+                    site_address = report.get("site_address")
+                    st.text(
+                        f"GPS: {gps_lat}, {gps_lon}"
+                        + (f"\nAddress: {site_address}" if site_address else "")
+                    )
                 
                 # Actions
                 st.markdown("---")
@@ -3269,37 +4173,21 @@ else:
                         )
                 
                 with col_act2:
-                        # Export single report to PDF (cached per filename)
-                        proj_name = report.get("project_name", "project").replace(" ", "_")
-                        site_name = report.get("site_name", "site").replace(" ", "_")
-                        cache = _get_saved_reports_asset_cache()
-                        cache_key = f"pdf:{filename}"
-                        pdf_single_bytes = cache.get(cache_key)
-                        if pdf_single_bytes is None:
-                            decoded_report = decode_binary_data(copy.deepcopy(report))
-                            pdf_single_bytes = create_pdf_bytes([decoded_report]).getvalue()
-                            cache[cache_key] = pdf_single_bytes
-                        st.download_button(
+                        # Export single report to PDF (cached per filename + mtime)
+                        deferred_download_button(
                             "📄 PDF",
-                            data=pdf_single_bytes,
-                            file_name=f"{proj_name}_{site_name}_report.pdf",
+                            lambda: saved_report_pdf_bytes(filename, mtime_ns, report),
+                            file_name=f"{export_stem}_report.pdf",
                             mime="application/pdf",
                             key=f"pdf_{filename}",
                         )
                 
                 with col_act3:
-                        # Export to Excel (cached per filename)
-                        cache = _get_saved_reports_asset_cache()
-                        cache_key = f"excel:{filename}"
-                        excel_single_bytes = cache.get(cache_key)
-                        if excel_single_bytes is None:
-                            decoded_report = decode_binary_data(copy.deepcopy(report))
-                            excel_single_bytes = create_excel_bytes([decoded_report]).getvalue()
-                            cache[cache_key] = excel_single_bytes
-                        st.download_button(
+                        # Export to Excel (cached per filename + mtime)
+                        deferred_download_button(
                             "📊 Excel",
-                            data=excel_single_bytes,
-                            file_name=f"{proj_name}_{site_name}_data.xlsx",
+                            lambda: saved_report_excel_bytes(filename, mtime_ns, report),
+                            file_name=f"{export_stem}_data.xlsx",
                             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                             key=f"excel_{filename}",
                         )
@@ -3316,34 +4204,29 @@ else:
         st.markdown("---")
         st.subheader("Bulk Export")
         col_bulk1, col_bulk2 = st.columns(2)
+        bulk_keys = tuple((r.get("_filename"), r.get("_mtime_ns")) for r in filtered_reports)
+        # A different selection gets fresh prepare buttons rather than an eager rebuild.
+        bulk_tag = hashlib.sha1(repr(bulk_keys).encode("utf-8")).hexdigest()[:12]
         
         with col_bulk1:
-            # Export all filtered reports to Excel
-            if filtered_reports:
-                decoded_reports = [
-                    decode_binary_data(copy.deepcopy(r)) for r in filtered_reports
-                ]
-                excel_all = create_excel_bytes(decoded_reports)
-                st.download_button(
-                    "📊 Export all filtered reports to Excel",
-                    data=excel_all,
-                    file_name="all_saved_reports.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                )
-        
+            # Export all filtered reports to Excel, built only on request
+            deferred_download_button(
+                "📊 Export all filtered reports to Excel",
+                lambda: saved_reports_excel_bytes(bulk_keys, filtered_reports),
+                file_name="all_saved_reports.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                key=f"bulk_excel_{bulk_tag}",
+            )
+
         with col_bulk2:
-            # Export all filtered reports to a combined PDF
-            if filtered_reports:
-                decoded_reports = [
-                    decode_binary_data(copy.deepcopy(r)) for r in filtered_reports
-                ]
-                pdf_all = create_pdf_bytes(decoded_reports)
-                st.download_button(
-                    "📄 Export all filtered reports to PDF",
-                    data=pdf_all,
-                    file_name="all_saved_reports.pdf",
-                    mime="application/pdf",
-                )
+            # Export all filtered reports to a combined PDF, built only on request
+            deferred_download_button(
+                "📄 Export all filtered reports to PDF",
+                lambda: saved_reports_pdf_bytes(bulk_keys, filtered_reports),
+                file_name="all_saved_reports.pdf",
+                mime="application/pdf",
+                key=f"bulk_pdf_{bulk_tag}",
+            )
 
 st.markdown("---")
 st.caption(
@@ -3355,16 +4238,7 @@ st.caption(
 st.markdown("---")
 st.subheader("GitHub Storage")
 
-token_env = os.getenv("GITHUB_REPORT_TOKEN") or os.getenv("GITHUB_TOKEN")
-try:
-    token_secret = (
-        st.secrets.get("github_report_token")
-        if hasattr(st, "secrets")
-        else None
-    )
-except Exception:
-    token_secret = None
-github_token = token_secret or token_env
+github_token = configured_github_token()
 
 default_repo = os.getenv("GITHUB_REPORT_REPO", "")
 default_branch = os.getenv("GITHUB_REPORT_BRANCH", "main")
@@ -3398,22 +4272,39 @@ if not github_token:
     )
 elif not repo_value.strip():
     st.info("Enter the target GitHub repository to enable uploads.")
+elif not sites:
+    st.info("Add a site to the current project to enable uploads.")
 else:
     if st.button(
         "⬆️ Upload selected site bundle to GitHub",
         use_container_width=True,
         key="github_upload_button",
     ):
-        try:
-            result = upload_site_report_to_github(
-                selected_site,
-                pdf_bytes,
-                repo_value.strip(),
-                token=github_token,
-                branch=branch_value.strip() or "main",
-                base_folder=folder_value.strip() or "reports",
-            )
-            destination = result.get("html_url") or result.get("path")
-            st.success(f"Report uploaded to GitHub ({destination}).")
-        except Exception as exc:
-            st.error(f"GitHub upload failed: {exc}")
+        upload_branch = branch_value.strip() or "main"
+        upload_folder = folder_value.strip() or "reports"
+        # The site fingerprint covers everything in the bundle, so an unchanged
+        # site already pushed to the same file in this session is not re-sent.
+        upload_target = (
+            repo_value.strip(),
+            upload_branch,
+            generate_site_storage_path(selected_site, upload_folder),
+        )
+        upload_fingerprint = site_fingerprint(selected_site)
+        uploaded = st.session_state.setdefault("_github_uploaded", {})
+        if uploaded.get(upload_target) == upload_fingerprint:
+            st.info("This site is unchanged since it was last uploaded; nothing to send.")
+        else:
+            try:
+                result = upload_site_report_to_github(
+                    selected_site,
+                    pdf_bytes,
+                    upload_target[0],
+                    token=github_token,
+                    branch=upload_branch,
+                    base_folder=upload_folder,
+                )
+                uploaded[upload_target] = upload_fingerprint
+                destination = result.get("html_url") or result.get("path")
+                st.success(f"Report uploaded to GitHub ({destination}).")
+            except Exception as exc:
+                st.error(f"GitHub upload failed: {exc}")
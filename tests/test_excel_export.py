@@ -0,0 +1,52 @@
+import io
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+import app
+
+
+SITES = [
+    {"site_name": "MH-01", "pipe_diameter_mm": 300, "gps_lat": -27.4, "photos": []},
+    {"site_name": "MH-02", "client": "River Council", "flow_diff_percent": 4.5},
+]
+
+
+class CreateExcelBytesTests(unittest.TestCase):
+    def _read(self, buf):
+        return pd.read_excel(io.BytesIO(buf.getvalue()), sheet_name="Sites Summary")
+
+    def test_export_columns_follow_site_export_order(self):
+        df = self._read(app.create_excel_bytes(SITES))
+
+        self.assertEqual(
+            list(df.columns),
+            ["client", "site_name", "pipe_diameter_mm", "gps_lat", "flow_diff_percent"],
+        )
+        self.assertEqual(df["site_name"].tolist(), ["MH-01", "MH-02"])
+
+    def test_openpyxl_fallback_writes_the_same_sheet(self):
+        with mock.patch.object(app, "_excel_engine", return_value="openpyxl"):
+            fallback = self._read(app.create_excel_bytes(SITES))
+
+        self.assertTrue(fallback.equals(self._read(app.create_excel_bytes(SITES))))
+
+    def test_url_like_text_is_written_as_plain_text(self):
+        from openpyxl import load_workbook
+
+        buf = app.create_excel_bytes([{"site_name": "https://example.com/mh-01"}])
+
+        cell = load_workbook(buf)["Sites Summary"]["A2"]
+        self.assertEqual(cell.value, "https://example.com/mh-01")
+        self.assertIsNone(cell.hyperlink)
+
+
+if __name__ == "__main__":
+    unittest.main()
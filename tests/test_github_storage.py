@@ -11,6 +11,8 @@ if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
 from app import (  # noqa: E402
+    B64_CHUNK_BYTES,
+    b64encode_text,
     build_site_report_bundle,
     generate_site_storage_path,
     slugify_path_component,
@@ -78,6 +80,14 @@ class GitHubStorageHelpersTests(unittest.TestCase):
             hashlib.sha256(b"diagram-bytes").hexdigest(),
         )
 
+    def test_chunked_base64_matches_one_shot_encoding(self):
+        payload = bytes(range(256)) * (B64_CHUNK_BYTES // 100)
+
+        self.assertEqual(b64encode_text(payload), base64.b64encode(payload).decode("ascii"))
+        self.assertEqual(
+            b64encode_text(bytearray(payload[:10])), base64.b64encode(payload[:10]).decode("ascii")
+        )
+
 
 class GitHubUploadTests(unittest.TestCase):
     def setUp(self):
@@ -102,11 +112,10 @@ class GitHubUploadTests(unittest.TestCase):
         )
 
         expected_url = "https://api.github.com/repos/org/repo/contents/reports/northside-expansion/mh-27-river-road.json"
-        mock_session.get.assert_called_once()
-        self.assertEqual(mock_session.get.call_args.args[0], expected_url)
-        self.assertEqual(mock_session.get.call_args.kwargs["params"], {"ref": "main"})
+        mock_session.get.assert_not_called()
 
         mock_session.put.assert_called_once()
+        self.assertEqual(mock_session.put.call_args.args[0], expected_url)
         put_kwargs = mock_session.put.call_args.kwargs
         self.assertEqual(put_kwargs["headers"]["Authorization"], "Bearer dummy-token")
         payload = put_kwargs["json"]
@@ -119,13 +128,15 @@ class GitHubUploadTests(unittest.TestCase):
 
     def test_upload_updates_existing_file(self):
         mock_session = mock.Mock()
-        mock_session.get.return_value.status_code = 200
-        mock_session.get.return_value.json.return_value = {"sha": "existing-sha"}
-        mock_session.put.return_value.status_code = 200
-        mock_session.put.return_value.json.return_value = {
+        rejected = mock.Mock(status_code=422, text='{"message": "Invalid request. \\"sha\\" wasn\'t supplied."}')
+        accepted = mock.Mock(status_code=200)
+        accepted.json.return_value = {
             "content": {"html_url": "https://github.com/org/repo/blob/main/reports/file.json"},
             "commit": {"sha": "def456"},
         }
+        mock_session.put.side_effect = [rejected, accepted]
+        mock_session.get.return_value.status_code = 200
+        mock_session.get.return_value.json.return_value = {"sha": "existing-sha"}
 
         result = upload_site_report_to_github(
             self.site,
@@ -135,12 +146,31 @@ class GitHubUploadTests(unittest.TestCase):
             session=mock_session,
         )
 
+        self.assertEqual(mock_session.put.call_count, 2)
         payload = mock_session.put.call_args.kwargs["json"]
         self.assertEqual(payload["message"], "Update installation report for MH-27 / River Road")
         self.assertEqual(payload["sha"], "existing-sha")
-        self.assertEqual(mock_session.get.call_args.kwargs["params"], {"ref": "main"})
+        mock_session.get.assert_called_once()
+        get_kwargs = mock_session.get.call_args.kwargs
+        self.assertEqual(get_kwargs["params"], {"ref": "main"})
+        self.assertEqual(get_kwargs["headers"]["Accept"], "application/vnd.github.object+json")
         self.assertEqual(result["commit_sha"], "def456")
 
+    def test_upload_error_is_raised_without_retry(self):
+        mock_session = mock.Mock()
+        mock_session.put.return_value = mock.Mock(status_code=403, text="Resource not accessible")
+
+        with self.assertRaises(RuntimeError):
+            upload_site_report_to_github(
+                self.site,
+                self.pdf,
+                "org/repo",
+                token="dummy-token",
+                session=mock_session,
+            )
+
+        mock_session.put.assert_called_once()
+        mock_session.get.assert_not_called()
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,99 @@
+import math
+import sys
+import unittest
+from datetime import date, time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from app import (
+    build_site_record,
+    calculate_average_depth_velocity_and_flow,
+    wetted_area_circular_m2,
+    wetted_area_circular_np,
+)
+
+
+class AverageDepthVelocityFlowTests(unittest.TestCase):
+    def test_averages_only_positive_readings(self):
+        result = calculate_average_depth_velocity_and_flow(
+            300,
+            100.0,
+            0.0,
+            0.5,
+            0.6,
+            [
+                {"depth_meas_mm": 120.0, "depth_meter_mm": 110.0, "vel_meas_ms": 0.0, "vel_meter_ms": 0.8},
+                {"depth_meas_mm": 0.0},
+            ],
+        )
+
+        self.assertAlmostEqual(result["avg_depth_meas_mm"], 110.0)
+        self.assertAlmostEqual(result["avg_depth_meter_mm"], 110.0)
+        self.assertAlmostEqual(result["avg_vel_meas_ms"], 0.5)
+        self.assertAlmostEqual(result["avg_vel_meter_ms"], 0.7)
+        self.assertIsInstance(result["avg_depth_meas_mm"], float)
+
+        expected_q_meas = wetted_area_circular_m2(110.0, 300) * 0.5 * 1000.0
+        self.assertAlmostEqual(result["flow_meas_lps"], expected_q_meas)
+
+    def test_no_readings_yield_zero_flow(self):
+        result = calculate_average_depth_velocity_and_flow(300, 0, 0, 0.0, 0.0, None)
+
+        self.assertEqual(result["avg_depth_meas_mm"], 0.0)
+        self.assertEqual(result["flow_meas_lps"], 0.0)
+        self.assertEqual(result["flow_diff_percent"], 0.0)
+
+    def test_primary_only_matches_averaged_path(self):
+        scalar = calculate_average_depth_velocity_and_flow(300, 140.0, 135.0, 0.45, 0.0, [])
+        averaged = calculate_average_depth_velocity_and_flow(300, 140.0, 135.0, 0.45, 0.0, [{}])
+
+        self.assertEqual(scalar.keys(), averaged.keys())
+        for key, value in averaged.items():
+            self.assertAlmostEqual(scalar[key], value, msg=key)
+            self.assertIsInstance(scalar[key], float)
+
+    def test_full_pipe_area(self):
+        self.assertAlmostEqual(wetted_area_circular_m2(500, 300), math.pi * 0.15 * 0.15)
+
+    def test_vectorised_area_matches_scalar(self):
+        depths = [-5.0, 0.0, 10.0, 150.0, 299.0, 300.0, 450.0]
+
+        areas = wetted_area_circular_np(depths, 300)
+
+        for depth, area in zip(depths, areas):
+            self.assertAlmostEqual(area, wetted_area_circular_m2(depth, 300))
+        self.assertEqual(list(wetted_area_circular_np(depths, 0)), [0.0] * len(depths))
+
+
+class BuildSiteRecordTests(unittest.TestCase):
+    def test_derived_fields_are_filled_in(self):
+        values = {
+            "site_name": "MH-01",
+            "install_date": date(2024, 11, 3),
+            "install_time": time(9, 15),
+            "prepared_date": date(2024, 11, 4),
+            "reviewed_date": date(2024, 11, 5),
+            "pipe_diameter_mm": 300,
+            "depth_check_meas_mm": 100,
+            "depth_check_meter_mm": 108,
+            "depth_check_tolerance_mm": 5,
+            "vel_check_meas_ms": 0.5,
+            "vel_check_meter_ms": 0.6,
+        }
+
+        record = build_site_record(values, verification_readings=[], diagram=None, photos=[])
+
+        self.assertEqual(record["install_date"], "2024-11-03")
+        self.assertEqual(record["install_time"], "09:15")
+        self.assertEqual(record["depth_check_diff_mm"], 8)
+        self.assertFalse(record["depth_check_within_tol"])
+        self.assertAlmostEqual(record["vel_check_diff_ms"], 0.1)
+        self.assertIn("flow_meas_lps", record)
+        self.assertIsInstance(values["install_date"], date)
+
+
+if __name__ == "__main__":
+    unittest.main()
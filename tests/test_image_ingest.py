@@ -0,0 +1,52 @@
+import io
+import sys
+import unittest
+from pathlib import Path
+
+from PIL import Image
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from app import PHOTO_MAX_PX, downscale_image_record
+
+
+def _image_bytes(size, fmt, mode="RGB"):
+    buf = io.BytesIO()
+    Image.new(mode, size, "white").save(buf, format=fmt)
+    return buf.getvalue()
+
+
+class DownscaleImageRecordTests(unittest.TestCase):
+    def test_large_photo_is_shrunk_to_jpeg(self):
+        record = {"name": "Inlet", "data": _image_bytes((4000, 3000), "JPEG"), "mime": "image/jpeg"}
+
+        shrunk = downscale_image_record(record)
+
+        with Image.open(io.BytesIO(shrunk["data"])) as img:
+            self.assertEqual(img.size, (PHOTO_MAX_PX, 1200))
+            self.assertEqual(img.format, "JPEG")
+        self.assertEqual(shrunk["name"], "Inlet")
+        self.assertEqual(shrunk["mime"], "image/jpeg")
+
+    def test_png_diagram_stays_png(self):
+        record = {"name": "Diagram", "data": _image_bytes((2400, 2400), "PNG", "RGBA")}
+
+        shrunk = downscale_image_record(record)
+
+        with Image.open(io.BytesIO(shrunk["data"])) as img:
+            self.assertEqual(img.format, "PNG")
+            self.assertEqual(img.size, (PHOTO_MAX_PX, PHOTO_MAX_PX))
+        self.assertEqual(shrunk["mime"], "image/png")
+
+    def test_small_or_invalid_images_are_returned_unchanged(self):
+        small = {"name": "Small", "data": _image_bytes((800, 600), "JPEG"), "mime": "image/jpeg"}
+        invalid = {"name": "Broken", "data": b"not-an-image"}
+
+        self.assertIs(downscale_image_record(small), small)
+        self.assertIs(downscale_image_record(invalid), invalid)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,7 +6,7 @@ ROOT_DIR = Path(__file__).resolve().parents[1]
 if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
-from app import merge_photo_records
+from app import merge_photo_records, photo_fingerprint
 
 
 class MergePhotoRecordsTests(unittest.TestCase):
@@ -62,6 +62,22 @@ class MergePhotoRecordsTests(unittest.TestCase):
         self.assertEqual(merged[0]["name"], "Site photo")
         self.assertEqual(merged[1]["name"], "New")
 
+    def test_fingerprints_are_cached_on_merged_records(self):
+        merged = merge_photo_records([{"name": "A", "data": b"a-bytes"}], [{"name": "B", "data": b"b-bytes"}])
+
+        self.assertEqual(merged[0]["_h"], photo_fingerprint({"data": b"a-bytes"}))
+        self.assertEqual(merged[1]["_h"], photo_fingerprint({"data": b"b-bytes"}))
+
+    def test_every_payload_is_fingerprinted_once(self):
+        existing = [{"name": f"E{i}", "data": bytes([i]) * 4096} for i in range(4)]
+        new = [{"name": "Dup", "data": bytes([0]) * 4096}, {"name": "N", "data": b"n" * 512}]
+
+        merged = merge_photo_records(existing, new)
+
+        self.assertEqual([m["name"] for m in merged], ["Dup", "E1", "E2", "E3", "N"])
+        for record in merged:
+            self.assertEqual(record["_h"], photo_fingerprint({"data": record["data"]}))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,340 @@
+import io
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from PyPDF2 import PdfReader
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+import app
+
+
+def _site(name):
+    return {
+        "project_name": "Stage 2",
+        "client": "River Council",
+        "site_name": name,
+        "site_id": name.upper(),
+        "photos": [],
+    }
+
+
+def _page_labels(pdf_bytes):
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    return [page.extract_text().strip().splitlines()[-1] for page in reader.pages]
+
+
+class CreatePdfBytesTests(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(app, "STATICMAP_AVAILABLE", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patcher = mock.patch.object(app, "SITE_PDF_CACHE_DIR", Path(tmp.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_single_site_pages_are_numbered(self):
+        labels = _page_labels(app.create_pdf_bytes([_site("MH-01")]).getvalue())
+
+        total = len(labels)
+        self.assertEqual(labels, [f"{i} of {total}" for i in range(1, total + 1)])
+
+    def test_pages_are_numbered_across_sites(self):
+        per_site = len(_page_labels(app.create_pdf_bytes([_site("MH-01")]).getvalue()))
+
+        pdf = app.create_pdf_bytes([_site("MH-01"), _site("MH-02"), _site("MH-03")])
+        labels = _page_labels(pdf.getvalue())
+
+        total = 3 * per_site
+        self.assertEqual(labels, [f"{i} of {total}" for i in range(1, total + 1)])
+
+    def test_site_metadata_is_attached(self):
+        pdf = app.create_pdf_bytes([_site("MH-01")]).getvalue()
+
+        root = PdfReader(io.BytesIO(pdf)).trailer["/Root"]
+        names = root["/Names"]["/EmbeddedFiles"]["/Names"]
+        self.assertEqual(names[0], "site_data.json")
+
+    def test_private_fields_are_left_out_of_metadata(self):
+        site = dict(_site("MH-01"), _filename="a.json", _search_blob="stage 2", _mtime_ns=1)
+
+        pdf = app.create_pdf_bytes([site]).getvalue()
+
+        root = PdfReader(io.BytesIO(pdf)).trailer["/Root"]
+        spec = root["/Names"]["/EmbeddedFiles"]["/Names"][1].get_object()
+        (meta,) = json.loads(spec["/EF"]["/F"].get_object().get_data())
+        self.assertEqual(meta["site_name"], "MH-01")
+        self.assertEqual([k for k in meta if k.startswith("_")], [])
+
+    def test_no_sites_skip_the_merge_pass(self):
+        pdf = app.create_pdf_bytes([]).getvalue()
+
+        self.assertTrue(pdf.startswith(b"%PDF"))
+        self.assertNotIn(b"/EmbeddedFiles", pdf)
+
+    def test_footer_is_laid_out_once_per_site(self):
+        canvas = app.NumberedCanvas(io.BytesIO(), pagesize=app.A4)
+        app._draw_site_pages(canvas, _site("MH-04"), *app.A4)
+
+        self.assertGreater(canvas.page_count, 1)
+        self.assertEqual(len(canvas.footer_forms), 1)
+
+    def test_bulk_saved_reports_are_numbered_across_reports(self):
+        reports = [_site("MH-05"), _site("MH-06"), _site("MH-07")]
+        keys = tuple((f"{r['site_name']}.json", 1) for r in reports)
+
+        pdf = app.saved_reports_pdf_bytes(keys, reports)
+
+        labels = _page_labels(pdf)
+        total = len(labels)
+        self.assertEqual(labels, [f"{i} of {total}" for i in range(1, total + 1)])
+
+    def test_oversized_photos_are_embedded_downscaled(self):
+        from PIL import Image
+
+        raw = io.BytesIO()
+        Image.new("RGB", (3200, 2400), "white").save(raw, format="JPEG")
+        photo = {"name": "Inlet", "data": raw.getvalue(), "mime": "image/jpeg"}
+
+        reader = app._image_reader_for(photo)
+
+        self.assertEqual(reader.getSize(), (1600, 1200))
+        self.assertEqual(photo["data"], raw.getvalue())
+
+    def test_photo_readers_are_shared_by_content_not_stored_on_records(self):
+        from PIL import Image
+
+        raw = io.BytesIO()
+        Image.new("RGB", (40, 30), "white").save(raw, format="PNG")
+        first = {"name": "Inlet", "data": raw.getvalue()}
+        second = {"name": "Copy", "data": raw.getvalue()}
+
+        reader = app._image_reader_for(first)
+
+        self.assertIs(app._image_reader_for(second), reader)
+        self.assertFalse(any(isinstance(v, app.ImageReader) for v in first.values()))
+
+
+class SiteMapDiskCacheTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patcher = mock.patch.object(app, "MAP_DISK_CACHE_DIR", Path(tmp.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_rendered_map_is_written_to_disk_and_reused(self):
+        from PIL import Image
+
+        fake_map = mock.Mock()
+        fake_map.return_value.render.return_value = Image.new("RGB", (4, 3), "white")
+        with mock.patch.object(app, "PooledStaticMap", fake_map):
+            png = app._render_site_map_png(-27.41, 153.01, 19, 4, 3, -27.41, 153.01)
+        app._render_site_map_png.clear()
+
+        with mock.patch.object(app, "PooledStaticMap", side_effect=AssertionError("refetched")):
+            again = app._render_site_map_png(-27.41, 153.01, 19, 4, 3, -27.41, 153.01)
+
+        self.assertTrue(png.startswith(b"\x89PNG"))
+        self.assertEqual(again, png)
+
+    def test_map_is_drawn_at_exact_coordinates(self):
+        from PIL import Image
+
+        app._render_site_map_png.clear()
+        self.addCleanup(app._render_site_map_png.clear)
+        fake_map = mock.Mock()
+        fake_map.return_value.render.return_value = Image.new("RGB", (4, 3), "white")
+        with mock.patch.object(app, "STATICMAP_AVAILABLE", True), \
+                mock.patch.object(app, "PooledStaticMap", fake_map), \
+                mock.patch.object(app, "CircleMarker", create=True) as marker:
+            self.assertIsNotNone(app.create_site_map_bytes("-27.4123456", "153.0123456", 19, 4, 3))
+
+        marker.assert_called_once_with((153.0123456, -27.4123456), "red", 12)
+        self.assertEqual(len(list(app.MAP_DISK_CACHE_DIR.glob("*.png"))), 1)
+        self.assertTrue(app._map_disk_cache_path(-27.41235, 153.01235, 19, 4, 3).exists())
+
+    def test_writing_a_map_prunes_expired_and_excess_files(self):
+        from PIL import Image
+
+        cache_dir = app.MAP_DISK_CACHE_DIR
+        expired, oldest, recent = (cache_dir / f"{name}.png" for name in ("expired", "oldest", "recent"))
+        now = app._time.time()
+        for age, path in ((app.MAP_DISK_CACHE_MAX_AGE_S + 60, expired), (120, oldest), (60, recent)):
+            path.write_bytes(b"x" * 400)
+            app.os.utime(path, (now - age, now - age))
+
+        fake_map = mock.Mock()
+        fake_map.return_value.render.return_value = Image.new("RGB", (4, 3), "white")
+        with mock.patch.object(app, "PooledStaticMap", fake_map), \
+                mock.patch.object(app, "MAP_DISK_CACHE_MAX_BYTES", 500):
+            app._render_site_map_png(-27.42, 153.02, 19, 4, 3, -27.42, 153.02)
+
+        self.assertFalse(expired.exists())
+        self.assertFalse(oldest.exists())
+        self.assertTrue(recent.exists())
+        self.assertEqual(len(list(cache_dir.glob("*.png"))), 2)
+
+    @unittest.skipUnless(app.STATICMAP_AVAILABLE, "staticmap not installed")
+    def test_tiles_are_shared_between_maps_and_failures_are_retried(self):
+        app._fetch_map_tile.clear()
+        self.addCleanup(app._fetch_map_tile.clear)
+        ok = mock.Mock(status_code=200, content=b"tile")
+        missing = mock.Mock(status_code=503, content=b"")
+        missing.raise_for_status.side_effect = app.requests.HTTPError(response=missing)
+        session = mock.Mock()
+        session.get.side_effect = [ok, missing, ok]
+
+        with mock.patch.object(app, "_tile_http_session", return_value=session):
+            first = app.PooledStaticMap(4, 3).get("https://tiles/1.png", timeout=5)
+            second = app.PooledStaticMap(4, 3).get("https://tiles/1.png", timeout=5)
+            failed = app.PooledStaticMap(4, 3).get("https://tiles/2.png", timeout=5)
+            retried = app.PooledStaticMap(4, 3).get("https://tiles/2.png", timeout=5)
+
+        self.assertEqual(first, (200, b"tile"))
+        self.assertEqual(second, first)
+        self.assertEqual(failed, (503, b""))
+        self.assertEqual(retried, (200, b"tile"))
+        self.assertEqual(session.get.call_count, 3)
+
+
+class SitePdfDiskCacheTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache_dir = Path(tmp.name)
+        for name, value in (("SITE_PDF_CACHE_DIR", self.cache_dir), ("STATICMAP_AVAILABLE", False)):
+            patcher = mock.patch.object(app, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_unchanged_site_is_served_from_disk(self):
+        pdf, _ = app.site_pdf_bytes(_site("MH-01"))
+
+        with mock.patch.object(app, "create_pdf_bytes", side_effect=AssertionError("re-rendered")):
+            again, complete = app.site_pdf_bytes(_site("MH-01"))
+
+        self.assertTrue(pdf.startswith(b"%PDF"))
+        self.assertEqual(again, pdf)
+        self.assertTrue(complete)
+        self.assertEqual(len(list(self.cache_dir.glob("*.pdf"))), 1)
+
+    def test_changed_site_is_rendered_again(self):
+        app.site_pdf_bytes(_site("MH-01"))
+
+        pdf, _ = app.site_pdf_bytes(dict(_site("MH-01"), client="Harbour Board"))
+
+        self.assertEqual(app.parse_pdf_report(pdf)["client"], "Harbour Board")
+        self.assertEqual(len(list(self.cache_dir.glob("*.pdf"))), 2)
+
+    def test_deleting_a_report_removes_its_cached_pdf(self):
+        with tempfile.TemporaryDirectory() as reports_dir, \
+                mock.patch.object(app, "REPORTS_DIR", Path(reports_dir)), \
+                mock.patch.object(app, "clear_saved_reports_cache"):
+            from PIL import Image
+
+            raw = io.BytesIO()
+            Image.new("RGB", (8, 6), "white").save(raw, format="JPEG")
+            photo = {"name": "Inlet", "data": raw.getvalue(), "mime": "image/jpeg"}
+            filename = app.save_report_to_database(dict(_site("MH-01"), photos=[photo]))
+            (report,) = app._load_all_reports_from_disk()
+            app.site_pdf_bytes(app.decode_binary_data(app.copy.deepcopy(report)))
+            self.assertEqual(len(list(self.cache_dir.glob("*.pdf"))), 1)
+
+            app.delete_report_from_database(filename)
+
+        self.assertEqual(list(self.cache_dir.glob("*.pdf")), [])
+
+    def test_site_without_its_map_is_not_stored(self):
+        site = dict(_site("MH-01"), gps_lat="-27.41", gps_lon="153.01")
+        with mock.patch.object(app, "STATICMAP_AVAILABLE", True), mock.patch.object(
+            app, "create_site_map_bytes", return_value=None
+        ):
+            pdf, complete = app.site_pdf_bytes(site)
+
+        self.assertTrue(pdf.startswith(b"%PDF"))
+        self.assertFalse(complete)
+        self.assertEqual(list(self.cache_dir.glob("*.pdf")), [])
+
+    def test_export_without_its_map_is_not_memoised(self):
+        site = dict(_site("MH-01"), gps_lat="-27.41", gps_lon="153.01")
+        fingerprint = app.site_fingerprint(site)
+        app._cached_site_pdf_bytes.clear()
+        self.addCleanup(app._cached_site_pdf_bytes.clear)
+
+        with mock.patch.object(app, "site_pdf_bytes", return_value=(b"%PDF-no-map", False)):
+            first = app.cached_site_pdf_bytes(fingerprint, site)
+        with mock.patch.object(app, "site_pdf_bytes", return_value=(b"%PDF-with-map", True)):
+            second = app.cached_site_pdf_bytes(fingerprint, site)
+        with mock.patch.object(app, "site_pdf_bytes", side_effect=AssertionError("re-rendered")):
+            third = app.cached_site_pdf_bytes(fingerprint, site)
+
+        self.assertEqual(first, b"%PDF-no-map")
+        self.assertEqual(second, b"%PDF-with-map")
+        self.assertEqual(third, second)
+
+    def test_saved_report_without_its_map_is_not_memoised(self):
+        report = dict(_site("MH-01"), gps_lat="-27.41", gps_lon="153.01")
+        app._saved_report_pdf_bytes.clear()
+        self.addCleanup(app._saved_report_pdf_bytes.clear)
+
+        with mock.patch.object(app, "site_pdf_bytes", return_value=(b"%PDF-no-map", False)):
+            first = app.saved_report_pdf_bytes("a.json", 1, report)
+        with mock.patch.object(app, "site_pdf_bytes", return_value=(b"%PDF-with-map", True)):
+            second = app.saved_report_pdf_bytes("a.json", 1, report)
+
+        self.assertEqual(first, b"%PDF-no-map")
+        self.assertEqual(second, b"%PDF-with-map")
+
+
+class ParsePdfReportTests(unittest.TestCase):
+    def test_labelled_fields_are_found_in_one_pass(self):
+        text = "Project name: Stage 2\nClient:\nRiver Council\nClient asset ID: CA9 | GIS ID: G7\nSite: MH-01."
+
+        parsed = app.extract_labelled_fields(text)
+
+        self.assertEqual(parsed["project_name"], "Stage 2")
+        self.assertEqual(parsed["client"], "River Council")
+        self.assertEqual(parsed["gis_id"], "G7")
+        self.assertEqual(parsed["site_name"], "MH-01")
+
+    def test_round_trip_of_generated_report(self):
+        with mock.patch.object(app, "STATICMAP_AVAILABLE", False):
+            pdf = app.create_pdf_bytes([_site("MH-03")]).getvalue()
+
+        parsed = app.parse_pdf_report(pdf)
+
+        self.assertEqual(parsed["client"], "River Council")
+        self.assertEqual(parsed["site_name"], "MH-03")
+
+    def test_text_extraction_stops_after_the_cap(self):
+        with mock.patch.object(app, "STATICMAP_AVAILABLE", False):
+            pdf = app.create_pdf_bytes([_site("MH-05")]).getvalue()
+
+        with mock.patch.object(app, "PDF_PARSE_MAX_CHARS", 1), mock.patch(
+            "PyPDF2._page.PageObject.extract_text", autospec=True, return_value="Client: River Council"
+        ) as extract:
+            parsed = app.parse_pdf_report(pdf)
+
+        self.assertEqual(extract.call_count, 1)
+        self.assertEqual(parsed["client"], "River Council")
+
+    def test_pdf_without_text_returns_nothing(self):
+        buf = io.BytesIO()
+        blank = app.canvas.Canvas(buf)
+        blank.showPage()
+        blank.save()
+
+        self.assertEqual(app.parse_pdf_report(buf.getvalue()), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
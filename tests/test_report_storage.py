@@ -0,0 +1,244 @@
+import base64
+import sys
+import tempfile
+import unittest
+from datetime import date, time
+from pathlib import Path
+from unittest import mock
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+import app
+from app import (
+    decode_binary_data,
+    dump_report_json,
+    encode_binary_data,
+    get_photo_bytes,
+    photo_fingerprint,
+    load_report_json,
+    normalize_draft,
+    report_blob_dir,
+    site_fingerprint,
+)
+
+
+class ReportSidecarStorageTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _record(self):
+        return {
+            "site_name": "MH-01",
+            "photos": [
+                {"name": "Inlet", "data": b"jpeg-bytes", "mime": "image/jpeg"},
+                {"name": "Outlet", "data": b"png-bytes", "mime": "image/png"},
+            ],
+            "diagram": {"name": "sketch.png", "data": b"diagram-bytes", "mime": "image/png"},
+        }
+
+    def test_encode_writes_sidecar_files_and_references_them(self):
+        blob_dir = self.tmp_path / "report.d"
+
+        encoded = encode_binary_data(self._record(), blob_dir=blob_dir)
+
+        self.assertNotIn("data", encoded["photos"][0])
+        self.assertEqual(encoded["photos"][0]["path"], "photo_0.jpg")
+        self.assertEqual(encoded["photos"][1]["path"], "photo_1.png")
+        self.assertEqual(encoded["diagram"]["path"], "diagram.png")
+        self.assertEqual((blob_dir / "photo_0.jpg").read_bytes(), b"jpeg-bytes")
+        self.assertEqual((blob_dir / "diagram.png").read_bytes(), b"diagram-bytes")
+
+    def test_decode_reads_sidecar_files_lazily(self):
+        report_path = self.tmp_path / "report.json"
+        encoded = encode_binary_data(self._record(), blob_dir=report_blob_dir(report_path))
+        encoded["_filepath"] = str(report_path)
+
+        decoded = decode_binary_data(encoded)
+
+        self.assertIsNone(decoded["photos"][1].get("data"))
+        self.assertEqual(get_photo_bytes(decoded["photos"][1]), b"png-bytes")
+        self.assertEqual(decoded["photos"][1]["data"], b"png-bytes")
+        self.assertEqual(get_photo_bytes(decoded["diagram"]), b"diagram-bytes")
+
+    def test_re_encoding_lazy_records_does_not_leak_private_keys(self):
+        report_path = self.tmp_path / "report.json"
+        encoded = encode_binary_data(self._record(), blob_dir=report_blob_dir(report_path))
+        encoded["_filepath"] = str(report_path)
+        decoded = decode_binary_data(encoded)
+
+        copied = encode_binary_data(decoded, blob_dir=self.tmp_path / "copy.d")
+
+        self.assertEqual(copied["photos"][0], {"name": "Inlet", "mime": "image/jpeg", "path": "photo_0.jpg"})
+        self.assertEqual((self.tmp_path / "copy.d" / "photo_0.jpg").read_bytes(), b"jpeg-bytes")
+
+    def test_legacy_base64_reports_still_decode(self):
+        legacy = {
+            "photos": [{"name": "Old", "data": base64.b64encode(b"old-bytes").decode("utf-8")}],
+            "diagram": {"name": "d", "data": base64.b64encode(b"old-diagram").decode("utf-8")},
+        }
+
+        decoded = decode_binary_data(legacy)
+
+        self.assertEqual(get_photo_bytes(decoded["photos"][0]), b"old-bytes")
+        self.assertEqual(get_photo_bytes(decoded["diagram"]), b"old-diagram")
+
+    def test_save_and_delete_manage_sidecar_directory(self):
+        with mock.patch.object(app, "REPORTS_DIR", self.tmp_path), \
+                mock.patch.object(app, "clear_saved_reports_cache"):
+            filename = app.save_report_to_database(self._record())
+            blob_dir = report_blob_dir(self.tmp_path / filename)
+            self.assertTrue((blob_dir / "photo_0.jpg").exists())
+            self.assertNotIn(b"jpeg-bytes", (self.tmp_path / filename).read_bytes())
+
+            self.assertTrue(app.delete_report_from_database(filename))
+            self.assertFalse(blob_dir.exists())
+
+    def test_loaded_draft_keeps_photos_after_report_is_deleted(self):
+        with mock.patch.object(app, "REPORTS_DIR", self.tmp_path), \
+                mock.patch.object(app, "clear_saved_reports_cache"), \
+                mock.patch.object(app, "safe_rerun"), \
+                mock.patch.object(app.st, "session_state", {}):
+            filename = app.save_report_to_database(self._record())
+            (report,) = app._load_all_reports_from_disk()
+            app.load_report_into_form(report)
+            app.delete_report_from_database(filename)
+
+            draft = app.st.session_state["draft_site"]
+
+        self.assertEqual(get_photo_bytes(draft["photos"][0]), b"jpeg-bytes")
+        self.assertEqual(get_photo_bytes(draft["diagram"]), b"diagram-bytes")
+
+    def test_reload_reuses_unchanged_reports(self):
+        with mock.patch.object(app, "REPORTS_DIR", self.tmp_path):
+            (self.tmp_path / "a.json").write_bytes(dump_report_json({"site_name": "A"}))
+            first = app._load_all_reports_from_disk()
+            (self.tmp_path / "b.json").write_bytes(dump_report_json({"site_name": "B"}))
+
+            second = app._load_all_reports_from_disk()
+
+        self.assertEqual([r["site_name"] for r in second], ["B", "A"])
+        self.assertIs(second[1], first[0])
+
+    def test_parsed_report_cache_is_bounded(self):
+        with mock.patch.object(app, "REPORTS_DIR", self.tmp_path), \
+                mock.patch.object(app, "REPORT_PARSE_CACHE_MAX_ENTRIES", 1):
+            (self.tmp_path / "a.json").write_bytes(dump_report_json({"site_name": "A"}))
+            (self.tmp_path / "b.json").write_bytes(dump_report_json({"site_name": "B"}))
+            app._load_all_reports_from_disk()
+
+        cached = [path for path, _ in app._parsed_report_cache() if path.startswith(str(self.tmp_path))]
+        self.assertEqual(cached, [str(self.tmp_path / "a.json")])
+
+    def test_directory_scan_lists_only_report_files(self):
+        with mock.patch.object(app, "REPORTS_DIR", self.tmp_path):
+            (self.tmp_path / "a.json").write_bytes(dump_report_json({"site_name": "A"}))
+            (self.tmp_path / "a.d").mkdir()
+            (self.tmp_path / "README.md").write_text("notes")
+            mtimes = app._report_file_mtimes()
+            fingerprint = app.reports_directory_fingerprint(mtimes)
+
+        self.assertEqual(list(mtimes), ["a.json"])
+        self.assertEqual(fingerprint[:2], (1, mtimes["a.json"]))
+
+    def test_loaded_reports_carry_a_search_blob(self):
+        with mock.patch.object(app, "REPORTS_DIR", self.tmp_path):
+            (self.tmp_path / "a.json").write_bytes(
+                dump_report_json({"project_name": "Stage 2", "site_name": "MH-01", "site_id": None})
+            )
+            (report,) = app._load_all_reports_from_disk()
+
+        self.assertIn("stage 2", report["_search_blob"])
+        self.assertIn("mh-01", report["_search_blob"])
+        self.assertNotIn("none", report["_search_blob"])
+
+    def test_sorted_views_are_reused_until_reports_reload(self):
+        reports = [{"site_name": "b"}, {"site_name": None}, {"site_name": "A"}]
+
+        by_site = app.sort_saved_reports(reports, "Site")
+
+        self.assertEqual([r["site_name"] for r in by_site], [None, "A", "b"])
+        self.assertIs(app.sort_saved_reports(reports, "Site"), by_site)
+        self.assertEqual(app.sort_saved_reports(reports, "Date (oldest)"), reports[::-1])
+        self.assertIsNot(app.sort_saved_reports(list(reports), "Site"), by_site)
+
+
+class ReportJsonCodecTests(unittest.TestCase):
+    def test_round_trip_preserves_values(self):
+        record = {"site_name": "MH-01", "flow_l_s": 12.5, "photos": [{"path": "photo_0.jpg"}]}
+
+        raw = dump_report_json(record)
+
+        self.assertIsInstance(raw, bytes)
+        self.assertEqual(load_report_json(raw), record)
+
+    def test_output_is_compact_utf8(self):
+        raw = dump_report_json({"site_address": "Café Road", "n": [1, 2]})
+
+        self.assertNotIn(b"\n", raw)
+        self.assertIn("Café".encode("utf-8"), raw)
+
+    def test_stdlib_fallback_is_compact_utf8(self):
+        record = {"site_address": "Café Road", "n": [1, 2], "ok": True}
+        with mock.patch.object(app, "ORJSON_AVAILABLE", False):
+            fallback = dump_report_json(record)
+
+        self.assertEqual(load_report_json(fallback), record)
+        self.assertNotIn(b" ", fallback.replace(b"Caf\xc3\xa9 Road", b""))
+        self.assertIn("Café".encode("utf-8"), fallback)
+
+    def test_unknown_types_fall_back_to_string(self):
+        class Marker:
+            def __str__(self):
+                return "marker"
+
+        self.assertEqual(load_report_json(dump_report_json({"x": Marker()})), {"x": "marker"})
+
+
+class FingerprintTests(unittest.TestCase):
+    def test_photo_fingerprint_is_cached_on_record(self):
+        photo = {"name": "Inlet", "data": b"jpeg-bytes"}
+
+        first = photo_fingerprint(photo)
+
+        self.assertEqual(photo["_h"], first)
+        self.assertEqual(photo_fingerprint({"data": b"jpeg-bytes"}), first)
+        self.assertNotEqual(photo_fingerprint({"data": b"other"}), first)
+        self.assertIsNone(photo_fingerprint({"name": "empty"}))
+
+    def test_site_fingerprint_tracks_fields_and_photos(self):
+        site = {"site_name": "MH-01", "photos": [{"name": "Inlet", "data": b"a"}]}
+        baseline = site_fingerprint(site)
+
+        self.assertEqual(site_fingerprint(dict(site, _filename="x.json")), baseline)
+        self.assertNotEqual(site_fingerprint(dict(site, site_name="MH-02")), baseline)
+        self.assertNotEqual(
+            site_fingerprint(dict(site, photos=[{"name": "Inlet", "data": b"b"}])), baseline
+        )
+
+
+class DraftNormalisationTests(unittest.TestCase):
+    def test_iso_strings_are_parsed_on_a_copy(self):
+        record = {
+            "install_date": "2024-11-03",
+            "install_time": "09:15",
+            "prepared_date": "not a date",
+            "reviewed_date": "",
+        }
+
+        draft = normalize_draft(record)
+
+        self.assertEqual(draft["install_date"], date(2024, 11, 3))
+        self.assertEqual(draft["install_time"], time(9, 15))
+        self.assertEqual(draft["prepared_date"], date.today())
+        self.assertEqual(draft["reviewed_date"], "")
+        self.assertEqual(record["install_date"], "2024-11-03")
+
+
+if __name__ == "__main__":
+    unittest.main()